@@ -18,12 +18,24 @@ class Settings(BaseSettings):
     ollama_url: str = Field(default="http://localhost:11434", description="Ollama service URL")
     ollama_host: str = Field(default="localhost:11434", description="Ollama host and port")
     ollama_timeout: int = Field(default=30, ge=1, le=300, description="Ollama request timeout in seconds")
+    ollama_http_backend: str = Field(default="httpx", description="HTTP client for Ollama generation requests (httpx or aiohttp)")
+    ollama_max_parallel: int = Field(default=4, ge=1, le=64, description="Maximum concurrent Ollama generation requests (keep <= OLLAMA_NUM_PARALLEL on the server)")
+    ollama_keep_alive: str = Field(default="30m", description="How long Ollama keeps a model (and its prompt cache) loaded after a request, e.g. 30m, 2h or -1 for forever")
+    ollama_embedding_model: str = Field(default="nomic-embed-text", description="Ollama model used for topic embeddings")
+
+    # Lesson caching
+    lesson_semantic_cache: bool = Field(default=False, description="Reuse cached lessons for near-duplicate topics using embeddings")
+    lesson_semantic_threshold: float = Field(default=0.92, ge=0.0, le=1.0, description="Minimum cosine similarity for a semantic lesson cache hit")
 
     # TTS Configuration
     tts_cache_dir: str = Field(default="static/audio", description="TTS audio cache directory")
     max_audio_cache_size: int = Field(default=1000, ge=1, description="Maximum cached audio files")
     tts_voices_dir: str = Field(default="voices", description="TTS voice models directory")
     tts_piper_path: str = Field(default="piper", description="Path to Piper TTS binary or Python module")
+    tts_max_parallel: int = Field(default=3, ge=1, le=64, description="Maximum concurrent TTS syntheses (extra requests wait instead of oversubscribing the CPU)")
+    tts_prefer_gpu: bool = Field(default=True, description="Run Piper on CUDA or CoreML when ONNX Runtime provides them")
+    tts_int8_quantization: bool = Field(default=False, description="Serve INT8-quantized Piper models on CPUs with VNNI support")
+    tts_onnx_threads: int = Field(default=0, ge=0, le=256, description="ONNX Runtime intra-op threads for Piper synthesis (0 = one per CPU core)")
 
     # CORS - Parse comma-separated string to list
     cors_origins: str = Field(default="http://localhost:3000,http://localhost:5173", description="CORS origins (comma-separated)")
@@ -46,6 +58,14 @@ class Settings(BaseSettings):
             raise ValueError('MongoDB URL must start with mongodb://')
         return v
 
+    @field_validator('ollama_http_backend')
+    @classmethod
+    def validate_ollama_http_backend(cls, v):
+        allowed_backends = ['httpx', 'aiohttp']
+        if v not in allowed_backends:
+            raise ValueError(f'Ollama HTTP backend must be one of: {allowed_backends}')
+        return v
+
     @field_validator('ollama_url')
     @classmethod
     def validate_ollama_url(cls, v):
@@ -2,15 +2,24 @@ from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import uvicorn
+import asyncio
 import os
+import queue
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from contextlib import asynccontextmanager
 
 from config import settings
 from database import connect_to_mongo, close_mongo_connection
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging - records are queued and written by a background listener thread
+# so request handlers never block on stdout
+log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+log_listener = QueueListener(log_queue, _log_stream_handler, respect_handler_level=True)
+log_listener.start()
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(log_queue)])
 logger = logging.getLogger(__name__)
 
 
@@ -31,11 +40,23 @@ async def lifespan(app: FastAPI):
         logger.warning(
             "Failed to connect to MongoDB - some features may not work")
 
+    # Open keep-alive connections to Ollama so the first lesson skips connection setup
+    from services.ollama_service import ollama_service
+    await ollama_service.warmup()
+
+    # Load the default Piper voice in the background; model loading can take a while
+    from services.tts_service import piper_tts_service
+    tts_warmup = asyncio.create_task(piper_tts_service.warmup())
+
     yield
 
     # Shutdown
+    tts_warmup.cancel()
+    piper_tts_service.save_cache_index()
+    await ollama_service.aclose()
     await close_mongo_connection()
     logger.info("Application shutdown complete")
+    log_listener.stop()
 
 app = FastAPI(
     title=settings.app_name,
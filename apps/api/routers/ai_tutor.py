@@ -14,7 +14,7 @@ from typing import Dict, List, Any, Optional
 import logging
 import asyncio
 from services.ai_tutor_service import AITutorService
-from services.lesson_structure_service import lesson_structure_service
+from services.lesson_structure_service import lesson_structure_service, LessonStructure
 from services.template_service import ContainerSize
 
 logger = logging.getLogger(__name__)
@@ -60,6 +60,11 @@ class LessonResponse(BaseModel):
     generation_stats: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
+class StructureBatchRequest(BaseModel):
+    topics: List[str] = Field(..., min_length=1, max_length=20, description="Topics to plan lessons for")
+    difficulty_level: str = Field("intermediate", description="Difficulty level: beginner, intermediate, or advanced")
+    target_duration: float = Field(120, description="Target lesson duration in seconds")
+
 class ProgressUpdate(BaseModel):
     status: str
     current_slide: int
@@ -247,35 +252,78 @@ async def analyze_lesson_structure(
         )
         
         # Format response
+        return {"success": True, **_format_lesson_structure(lesson_structure)}
+        
+    except Exception as e:
+        logger.error(f"Lesson structure analysis failed: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Structure analysis failed: {str(e)}"
+        )
+
+@router.post("/structure/batch")
+async def analyze_lesson_structures(request: StructureBatchRequest):
+    """
+    Plan lesson structures for a set of topics (curriculum mode)
+    
+    Topic analyses for the whole set are sent to the LLM together instead of
+    one request per topic.
+    """
+    
+    logger.info(f"Analyzing lesson structures for {len(request.topics)} topics")
+    
+    topics = [topic.strip() for topic in request.topics]
+    if not all(topics):
+        raise HTTPException(status_code=400, detail="Topics cannot be empty")
+    
+    if request.difficulty_level not in ["beginner", "intermediate", "advanced"]:
+        raise HTTPException(
+            status_code=400, 
+            detail="Difficulty level must be 'beginner', 'intermediate', or 'advanced'"
+        )
+    
+    try:
+        lesson_structures = await lesson_structure_service.analyze_topic_structures(
+            topics=topics,
+            difficulty_level=request.difficulty_level,
+            target_duration=request.target_duration
+        )
+        
         return {
             "success": True,
-            "topic": lesson_structure.topic,
-            "difficulty_level": lesson_structure.difficulty_level,
-            "total_slides": lesson_structure.total_slides,
-            "estimated_total_duration": lesson_structure.estimated_total_duration,
-            "teaching_strategy": lesson_structure.teaching_strategy,
-            "content_flow": lesson_structure.content_flow,
-            "slides": [
-                {
-                    "slide_number": slide.slide_number,
-                    "template_id": slide.template_id,
-                    "template_name": slide.template_name,
-                    "content_type": slide.content_type,
-                    "estimated_duration": slide.estimated_duration,
-                    "priority": slide.priority,
-                    "layout_hints": slide.layout_hints
-                }
-                for slide in lesson_structure.slides
-            ]
+            "structures": [_format_lesson_structure(structure) for structure in lesson_structures]
         }
         
     except Exception as e:
-        logger.error(f"Lesson structure analysis failed: {e}")
+        logger.error(f"Batch lesson structure analysis failed: {e}")
         raise HTTPException(
             status_code=500,
             detail=f"Structure analysis failed: {str(e)}"
         )
 
+def _format_lesson_structure(lesson_structure: LessonStructure) -> Dict[str, Any]:
+    """Serialize a planned lesson structure for API responses"""
+    return {
+        "topic": lesson_structure.topic,
+        "difficulty_level": lesson_structure.difficulty_level,
+        "total_slides": lesson_structure.total_slides,
+        "estimated_total_duration": lesson_structure.estimated_total_duration,
+        "teaching_strategy": lesson_structure.teaching_strategy,
+        "content_flow": lesson_structure.content_flow,
+        "slides": [
+            {
+                "slide_number": slide.slide_number,
+                "template_id": slide.template_id,
+                "template_name": slide.template_name,
+                "content_type": slide.content_type,
+                "estimated_duration": slide.estimated_duration,
+                "priority": slide.priority,
+                "layout_hints": slide.layout_hints
+            }
+            for slide in lesson_structure.slides
+        ]
+    }
+
 @router.get("/templates/categories")
 async def get_template_categories():
     """Get available template categories for lesson sections"""
@@ -249,7 +249,7 @@ async def create_lesson(request: CreateLessonRequest):
         )
         
     except Exception as e:
-        print(f"Error creating lesson: {e}")
+        logger.error(f"Error creating lesson: {e}")
         raise HTTPException(
             status_code=500,
             detail="Failed to create lesson"
@@ -414,7 +414,7 @@ async def get_lessons(
         ]
         
     except Exception as e:
-        print(f"Error fetching lessons: {e}")
+        logger.error(f"Error fetching lessons: {e}")
         raise HTTPException(
             status_code=500,
             detail="Failed to fetch lessons"
@@ -453,7 +453,7 @@ async def get_lesson(lesson_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error fetching lesson: {e}")
+        logger.error(f"Error fetching lesson: {e}")
         raise HTTPException(
             status_code=500,
             detail="Failed to fetch lesson"
@@ -569,7 +569,7 @@ async def generate_lesson_script(lesson_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error generating lesson script: {e}")
+        logger.error(f"Error generating lesson script: {e}")
         raise HTTPException(
             status_code=500,
             detail="Failed to generate lesson script"
@@ -783,8 +783,10 @@ async def generate_lesson_merged_audio(lesson_id: str, user_id: str = "default")
                             })
                             logger.debug(f"Recalculated timing for silent slide {slide_num}: {segment['start_time']:.2f}s -> {segment['end_time']:.2f}s")
                     
-                    # Clean up individual audio files after successful merge
-                    merger.cleanup_individual_files(audio_file_paths)
+                    # Clean up individual audio files after successful merge (through the TTS
+                    # service so it forgets the cached ids as well)
+                    for segment in segments_with_audio:
+                        await piper_tts_service.delete_audio(segment["audio_id"])
                     
                     # Set merged audio URL
                     merged_audio_url = f"/api/lesson/{lesson_id}/merged-audio"
@@ -987,7 +989,7 @@ async def get_lesson_script(lesson_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error getting lesson script: {e}")
+        logger.error(f"Error getting lesson script: {e}")
         raise HTTPException(
             status_code=500,
             detail="Failed to get lesson script"
@@ -1097,7 +1099,7 @@ async def generate_lesson_tts(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error generating lesson TTS: {e}")
+        logger.error(f"Error generating lesson TTS: {e}")
         raise HTTPException(
             status_code=500,
             detail="Failed to generate lesson TTS"
@@ -1152,13 +1154,77 @@ async def get_lesson_tts_status(lesson_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error getting lesson TTS status: {e}")
+        logger.error(f"Error getting lesson TTS status: {e}")
         raise HTTPException(
             status_code=500,
             detail="Failed to get lesson TTS status"
         )
 
 
+# ============ Streaming Lesson Steps ============
+
+class LessonStepsStreamRequest(BaseModel):
+    """Request for streaming ELI5 lesson steps"""
+    topic: str = Field(..., description="Educational topic to cover")
+    difficulty_level: str = Field("beginner", description="Difficulty level: beginner, intermediate, advanced")
+    user_id: str = Field("default", description="User ID for personalized settings")
+
+
+@router.post("/lesson/steps/stream")
+async def stream_lesson_steps(request: LessonStepsStreamRequest):
+    """Stream lesson steps as soon as each one has been generated"""
+    
+    async def generate():
+        try:
+            import json
+            
+            step_count = 0
+            async for step in ollama_service.stream_lesson_steps(
+                topic=request.topic,
+                difficulty_level=request.difficulty_level,
+                user_id=request.user_id
+            ):
+                step_count += 1
+                step_data = {
+                    "type": "step",
+                    "data": step.model_dump(mode="json")
+                }
+                yield f"data: {json.dumps(step_data)}\n\n"
+            
+            if step_count == 0:
+                error_data = {
+                    "type": "error",
+                    "data": {"error": "Failed to generate lesson content"}
+                }
+                yield f"data: {json.dumps(error_data)}\n\n"
+                return
+            
+            # Send completion signal
+            completion_data = {
+                "type": "complete",
+                "data": {"message": "Lesson steps generated", "total_steps": step_count}
+            }
+            yield f"data: {json.dumps(completion_data)}\n\n"
+            
+        except Exception as e:
+            logger.error(f"Error in streaming lesson steps: {e}")
+            error_data = {
+                "type": "error",
+                "data": {"error": str(e)}
+            }
+            yield f"data: {json.dumps(error_data)}\n\n"
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "Access-Control-Allow-Origin": "*",
+        }
+    )
+
+
 # ============ Phase 3: Timeline Layout Engine Endpoints ============
 
 class TimelineLayoutRequest(BaseModel):
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional, Dict, Any
 from models.settings import UserSettings, LLMSettings, TTSSettings, STTSettings, LanguageSettings, AppearanceSettings, LessonSettings, NotificationSettings, UserProfile
+from services.ollama_service import ollama_service
 from pydantic import BaseModel, Field
 import logging
 from datetime import datetime
@@ -107,6 +108,7 @@ async def create_user_settings(
             settings.notifications = settings_data.notifications
         
         await settings.save()
+        ollama_service.invalidate_user_settings(user_id)
         logger.info(f"Created settings for user: {user_id}")
         
         return SettingsResponse(
@@ -162,6 +164,7 @@ async def update_user_settings(
             settings.notifications = settings_data.notifications
         
         await settings.save()
+        ollama_service.invalidate_user_settings(user_id)
         logger.info(f"Updated settings for user: {user_id}")
         
         return SettingsResponse(
@@ -220,6 +223,7 @@ async def update_settings_section(
             )
         
         await settings.save()
+        ollama_service.invalidate_user_settings(user_id)
         logger.info(f"Updated {section} settings for user: {user_id}")
         
         return SettingsResponse(
@@ -258,6 +262,7 @@ async def delete_user_settings(
             )
         
         await settings.delete()
+        ollama_service.invalidate_user_settings(user_id)
         logger.info(f"Deleted settings for user: {user_id}")
         
         return {"message": f"Settings deleted for user: {user_id}"}
@@ -283,6 +288,7 @@ async def reset_user_settings(
         # Create new default settings
         settings = UserSettings(user_id=user_id)
         await settings.save()
+        ollama_service.invalidate_user_settings(user_id)
         
         logger.info(f"Reset settings to default for user: {user_id}")
         
@@ -15,6 +15,12 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+# Each file read in FileResponse is a worker-thread round trip; the 64 KiB default splits a typical
+# narration WAV (a few hundred KiB) into several of them, so cached audio is sent in 1 MiB reads
+class AudioFileResponse(FileResponse):
+    chunk_size = 1024 * 1024
+
+
 class TTSGenerateRequest(BaseModel):
     text: str
     voice: Optional[str] = None
@@ -250,12 +256,48 @@ async def generate_streaming_tts_audio(request: TTSStreamingRequest):
         raise ErrorHandler.handle_service_error("generate streaming TTS audio", e)
 
 
+@router.post("/tts/generate-pcm-stream")
+async def generate_pcm_stream_tts_audio(request: TTSGenerateRequest):
+    """Stream raw 16-bit little-endian mono PCM for the given text as it is synthesized"""
+    try:
+        if not request.text.strip():
+            raise HTTPException(
+                status_code=400,
+                detail="Text cannot be empty"
+            )
+        
+        # Raw PCM comes straight from the Piper Python module
+        if not piper_tts_service.use_python_piper or not await piper_tts_service.is_service_available():
+            raise HTTPException(
+                status_code=503,
+                detail="Piper TTS service is not available. Please use browser TTS as fallback."
+            )
+        
+        # The client wraps the stream once, using the format headers
+        return StreamingResponse(
+            piper_tts_service.generate_streaming_audio_pcm(request.text, request.voice),
+            media_type="application/octet-stream",
+            headers={
+                "X-Audio-Format": "s16le",
+                "X-Sample-Rate": str(piper_tts_service.get_voice_sample_rate(request.voice)),
+                "X-Channels": "1",
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no"
+            }
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise ErrorHandler.handle_service_error("stream TTS PCM audio", e)
+
+
 @router.get("/tts/audio/{audio_id}")
 async def get_tts_audio(audio_id: str):
     """Serve TTS audio file"""
     try:
-        # Validate audio_id format (should be SHA256 hash)
-        if len(audio_id) != 64 or not all(c in '0123456789abcdef' for c in audio_id):
+        # Validate audio_id format
+        if not piper_tts_service.is_valid_audio_id(audio_id):
             raise HTTPException(
                 status_code=400,
                 detail="Invalid audio ID format"
@@ -270,25 +312,29 @@ async def get_tts_audio(audio_id: str):
                 detail="Audio file not found"
             )
         
-        # Validate audio file exists and has content
-        if not audio_path.exists():
+        # Validate audio file exists and has content; one stat() covers both checks and is
+        # handed to FileResponse so it does not stat the file again
+        try:
+            stat_result = audio_path.stat()
+        except FileNotFoundError:
             raise HTTPException(
                 status_code=404,
                 detail="Audio file not found"
             )
         
         # Check if file has valid size (not empty)
-        if audio_path.stat().st_size == 0:
+        if stat_result.st_size == 0:
             raise HTTPException(
                 status_code=500,
                 detail="Audio file is empty"
             )
         
         # Return the audio file
-        return FileResponse(
+        return AudioFileResponse(
             path=audio_path,
             media_type="audio/wav",
             filename=f"{audio_id}.wav",
+            stat_result=stat_result,
             headers={
                 "Accept-Ranges": "bytes",
                 "Cache-Control": "public, max-age=3600"
@@ -306,7 +352,7 @@ async def delete_tts_audio(audio_id: str):
     """Delete a specific TTS audio file"""
     try:
         # Validate audio_id format
-        if len(audio_id) != 64 or not all(c in '0123456789abcdef' for c in audio_id):
+        if not piper_tts_service.is_valid_audio_id(audio_id):
             raise HTTPException(
                 status_code=400,
                 detail="Invalid audio ID format"
@@ -8,20 +8,115 @@ This service orchestrates the complete AI tutor lesson generation workflow:
 4. Calculates slide timing and positioning
 5. Handles slide verification and fallback content
 """
+import copy
 import json
 import logging
+import math
 import asyncio
 import time
 import re
+from types import MappingProxyType
 from typing import Dict, List, Any, Optional, AsyncGenerator, Tuple
 from dataclasses import dataclass, asdict
 from services.lesson_structure_service import lesson_structure_service, LessonStructure, SlideStructure
 from services.template_service import template_service, ContainerSize
 from services.template_filling_service import create_template_filler
 from services.ollama_service import ollama_service
+from utils.ttl_cache import TTLCache
+from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Difficulty levels recognised when reading them back out of slide prompts
+_DIFFICULTY_LEVELS = frozenset({"beginner", "intermediate", "advanced"})
+
+# Last-resort slide content per section type when every generation method fails.
+# The fallback tables are shared by every request, so they are exposed read-only.
+_FALLBACK_SLIDE_CONTENT = MappingProxyType({
+    "title-objective": {
+        "heading": "Learning About Title Objective",
+        "content": "By the end of this lesson, you will understand the key concepts and be able to apply what you've learned."
+    },
+    "context-motivation": {
+        "heading": "Why This Matters",
+        "content": "Understanding this topic is important for building a strong foundation in the subject and has practical applications in real-world scenarios."
+    },
+    "analogy": {
+        "heading": "Think of It Like This",
+        "content": "To help you understand this concept, imagine it like something familiar from everyday life that shares similar characteristics."
+    },
+    "definition": {
+        "heading": "What Is It?",
+        "content": "This concept can be defined as a fundamental principle that helps us understand how things work in this domain."
+    },
+    "step-by-step": {
+        "heading": "How It Works",
+        "content": "Let's break this down into clear, manageable steps: First, we identify the key components. Then, we examine how they interact. Finally, we see the overall result."
+    },
+    "examples": {
+        "heading": "Real Examples",
+        "content": "Here are some concrete examples that demonstrate this concept in action and help illustrate the key principles we've discussed."
+    },
+    "common-mistakes": {
+        "heading": "Watch Out For These",
+        "content": "Students often make certain mistakes when learning this topic. Being aware of these common pitfalls will help you avoid them."
+    },
+    "mini-recap": {
+        "heading": "Key Takeaways",
+        "content": "Let's review the most important points: we've covered the definition, seen examples, and learned how to apply the concepts correctly."
+    },
+    "things-to-ponder": {
+        "heading": "Think About This",
+        "content": "Consider how this concept connects to other things you've learned. What questions does it raise? How might you use this knowledge in the future?"
+    }
+})
+
+_DEFAULT_FALLBACK_SLIDE_CONTENT = {
+    "heading": "Educational Content",
+    "content": "Important information about this topic will be covered to help you learn effectively."
+}
+
+# Generic per-field fallbacks used when a template has no fallback data of its own
+_GENERIC_SLIDE_FALLBACKS = MappingProxyType({
+    "title-objective": {
+        "heading": "Title Objective",
+        "content": "Learning objectives will be covered in this lesson."
+    },
+    "definition": {
+        "heading": "Definition",
+        "content": "Key definition and explanation will be provided."
+    },
+    "process": {
+        "heading": "Process Steps", 
+        "content": "Step-by-step process will be explained."
+    },
+    "example": {
+        "heading": "Example",
+        "content": "Concrete example will be demonstrated."
+    },
+    "formula": {
+        "heading": "Formula",
+        "content": "Key formula and variables will be explained."
+    },
+    "comparison": {
+        "heading": "Comparison",
+        "content": "Key differences will be highlighted."
+    },
+    "concept-map": {
+        "heading": "Concept Overview",
+        "content": "Relationships between concepts will be shown."
+    },
+    "summary": {
+        "heading": "Summary",
+        "content": "Key takeaways from this lesson."
+    }
+})
+
+_DEFAULT_GENERIC_SLIDE_FALLBACK = {
+    "heading": "Content",
+    "content": "Content will be provided."
+}
+
 @dataclass
 class GeneratedSlide:
     """Single generated slide with all data"""
@@ -64,6 +159,14 @@ class AITutorService:
         self.slide_spacing = 100  # Space between slides
         self.crossfade_duration = 1.5  # 1500ms crossfade between audio segments for smoother transitions
         
+        # Fully generated lessons keyed by (topic, difficulty, duration, container size), replayed
+        # without any LLM calls when the same lesson is requested again
+        self._lesson_cache = TTLCache(maxsize=128, ttl=3600)
+        
+        # Optional semantic tier: (variant key, unit topic embedding, lesson cache key) entries
+        # so near-duplicate topics ("photosynthesis" vs "how photosynthesis works") reuse a lesson
+        self._semantic_index: List[Tuple[tuple, List[float], tuple]] = []
+        
     async def generate_ai_tutor_lesson(
         self, 
         topic: str, 
@@ -79,6 +182,30 @@ class AITutorService:
         start_time = time.time()
         logger.info(f"Starting AI tutor lesson generation: {topic}")
         
+        container = container_size or ContainerSize(width=1200, height=800)
+        cache_key = (
+            topic.strip().lower(), difficulty_level, float(target_duration),
+            container.width, container.height
+        )
+        cached_slides = self._lesson_cache.get(cache_key)
+        
+        topic_embedding = None
+        if cached_slides is None and settings.lesson_semantic_cache:
+            topic_embedding = await self._embed_topic(topic)
+            if topic_embedding:
+                cached_slides = self._find_similar_lesson(cache_key[1:], topic_embedding)
+        
+        if cached_slides is not None:
+            logger.info(f"Serving cached AI tutor lesson: {topic}")
+            total_slides = len(cached_slides)
+            for i, slide_result in enumerate(cached_slides):
+                yield await self._progress_update(
+                    f"Completed slide {i+1}/{total_slides}", 
+                    (i + 1) / total_slides, total_slides
+                ), copy.deepcopy(slide_result)
+            yield await self._progress_update("Lesson generation complete!", 1.0, total_slides), None
+            return
+        
         try:
             # Phase 1: Analyze lesson structure
             yield await self._progress_update("Analyzing lesson structure...", 0, 1), None
@@ -90,28 +217,37 @@ class AITutorService:
             total_slides = lesson_structure.total_slides
             logger.info(f"Lesson structure created: {total_slides} slides")
             
-            # Phase 2: Generate slides one by one
+            # Phase 2: Generate all slides concurrently (OllamaService bounds the LLM calls)
+            # and report them in order, so wall time tracks the slowest slide, not the sum
             generated_slides = []
-            container = container_size or ContainerSize(width=1200, height=800)
-            
-            for i, slide_structure in enumerate(lesson_structure.slides):
-                progress = (i + 1) / total_slides
-                yield await self._progress_update(
-                    f"Generating slide {i+1}/{total_slides}: {slide_structure.content_type}", 
-                    progress, total_slides
-                ), None
-                
-                slide_result = await self._generate_single_slide(
+            slide_tasks = [
+                asyncio.create_task(self._generate_single_slide(
                     slide_structure, i, total_slides, container
-                )
-                
-                generated_slides.append(slide_result)
-                
-                # Yield the completed slide
-                yield await self._progress_update(
-                    f"Completed slide {i+1}/{total_slides}", 
-                    progress, total_slides
-                ), slide_result
+                ))
+                for i, slide_structure in enumerate(lesson_structure.slides)
+            ]
+            
+            try:
+                for i, (slide_structure, slide_task) in enumerate(zip(lesson_structure.slides, slide_tasks)):
+                    progress = (i + 1) / total_slides
+                    yield await self._progress_update(
+                        f"Generating slide {i+1}/{total_slides}: {slide_structure.content_type}", 
+                        progress, total_slides
+                    ), None
+                    
+                    slide_result = await slide_task
+                    
+                    generated_slides.append(slide_result)
+                    
+                    # Yield the completed slide
+                    yield await self._progress_update(
+                        f"Completed slide {i+1}/{total_slides}", 
+                        progress, total_slides
+                    ), slide_result
+            finally:
+                # Stop outstanding slides if the consumer goes away mid-lesson
+                for slide_task in slide_tasks:
+                    slide_task.cancel()
             
             # Phase 3: Generate unified audio
             yield await self._progress_update("Creating unified audio...", 0.9, total_slides), None
@@ -126,6 +262,13 @@ class AITutorService:
                 generated_slides, audio_result, start_time
             )
             
+            # Only cache lessons where every slide generated cleanly
+            if generated_slides and all(slide.status == "success" for slide in generated_slides):
+                self._lesson_cache.set(cache_key, copy.deepcopy(generated_slides))
+                if topic_embedding:
+                    self._semantic_index.append((cache_key[1:], topic_embedding, cache_key))
+                    del self._semantic_index[:-self._lesson_cache.maxsize]
+            
             # Final completion update
             yield await self._progress_update("Lesson generation complete!", 1.0, total_slides), None
             
@@ -144,6 +287,36 @@ class AITutorService:
             }, None
             return
     
+    async def _embed_topic(self, topic: str) -> Optional[List[float]]:
+        """Embed a topic as a unit vector for the semantic lesson cache"""
+        embedding = await ollama_service.embed(topic.strip().lower())
+        if not embedding:
+            return None
+        norm = math.sqrt(sum(value * value for value in embedding))
+        return [value / norm for value in embedding] if norm else None
+    
+    def _find_similar_lesson(
+        self, variant: tuple, topic_embedding: List[float]
+    ) -> Optional[List[GeneratedSlide]]:
+        """Find cached slides for the most similar topic with the same difficulty, duration and size"""
+        best_similarity = settings.lesson_semantic_threshold
+        best_key = None
+        
+        # Drop entries whose lessons were evicted or expired
+        self._semantic_index = [entry for entry in self._semantic_index if entry[2] in self._lesson_cache]
+        
+        for entry_variant, entry_embedding, entry_key in self._semantic_index:
+            if entry_variant != variant or len(entry_embedding) != len(topic_embedding):
+                continue
+            similarity = sum(a * b for a, b in zip(entry_embedding, topic_embedding))
+            if similarity >= best_similarity:
+                best_similarity, best_key = similarity, entry_key
+        
+        if best_key is None:
+            return None
+        logger.info(f"Semantic lesson cache hit (similarity {best_similarity:.3f})")
+        return self._lesson_cache.get(best_key)
+    
     async def _generate_single_slide(
         self, 
         slide_structure: SlideStructure, 
@@ -294,56 +467,16 @@ class AITutorService:
                 difficulty_end = prompt.find(".", difficulty_start)
                 if difficulty_end != -1:
                     difficulty = prompt[difficulty_start:difficulty_end].strip()
-                    if difficulty in ["beginner", "intermediate", "advanced"]:
+                    if difficulty in _DIFFICULTY_LEVELS:
                         return difficulty
         return "intermediate"
     
     def _get_fallback_content(self, slide_structure: SlideStructure) -> Dict[str, str]:
         """Get fallback content when all generation methods fail"""
         
-        fallback_content_map = {
-            "title-objective": {
-                "heading": f"Learning About {slide_structure.content_type.replace('-', ' ').title()}",
-                "content": "By the end of this lesson, you will understand the key concepts and be able to apply what you've learned."
-            },
-            "context-motivation": {
-                "heading": "Why This Matters",
-                "content": "Understanding this topic is important for building a strong foundation in the subject and has practical applications in real-world scenarios."
-            },
-            "analogy": {
-                "heading": "Think of It Like This",
-                "content": "To help you understand this concept, imagine it like something familiar from everyday life that shares similar characteristics."
-            },
-            "definition": {
-                "heading": "What Is It?",
-                "content": "This concept can be defined as a fundamental principle that helps us understand how things work in this domain."
-            },
-            "step-by-step": {
-                "heading": "How It Works",
-                "content": "Let's break this down into clear, manageable steps: First, we identify the key components. Then, we examine how they interact. Finally, we see the overall result."
-            },
-            "examples": {
-                "heading": "Real Examples",
-                "content": "Here are some concrete examples that demonstrate this concept in action and help illustrate the key principles we've discussed."
-            },
-            "common-mistakes": {
-                "heading": "Watch Out For These",
-                "content": "Students often make certain mistakes when learning this topic. Being aware of these common pitfalls will help you avoid them."
-            },
-            "mini-recap": {
-                "heading": "Key Takeaways",
-                "content": "Let's review the most important points: we've covered the definition, seen examples, and learned how to apply the concepts correctly."
-            },
-            "things-to-ponder": {
-                "heading": "Think About This",
-                "content": "Consider how this concept connects to other things you've learned. What questions does it raise? How might you use this knowledge in the future?"
-            }
-        }
-        
-        return fallback_content_map.get(slide_structure.content_type, {
-            "heading": "Educational Content",
-            "content": "Important information about this topic will be covered to help you learn effectively."
-        })
+        fallback = _FALLBACK_SLIDE_CONTENT.get(slide_structure.content_type, _DEFAULT_FALLBACK_SLIDE_CONTENT)
+        # Callers fill in and modify the returned content, so hand out a copy
+        return dict(fallback)
     
     def _verify_and_add_fallback(
         self, filled_content: Dict[str, str], slide_structure: SlideStructure
@@ -360,48 +493,9 @@ class AITutorService:
         except Exception as e:
             logger.warning(f"Failed to get template fallbacks: {e}")
         
-        # Generic fallback content if template fallback not available
-        generic_fallback = {
-            "title-objective": {
-                "heading": slide_structure.content_type.replace("-", " ").title(),
-                "content": "Learning objectives will be covered in this lesson."
-            },
-            "definition": {
-                "heading": "Definition",
-                "content": "Key definition and explanation will be provided."
-            },
-            "process": {
-                "heading": "Process Steps", 
-                "content": "Step-by-step process will be explained."
-            },
-            "example": {
-                "heading": "Example",
-                "content": "Concrete example will be demonstrated."
-            },
-            "formula": {
-                "heading": "Formula",
-                "content": "Key formula and variables will be explained."
-            },
-            "comparison": {
-                "heading": "Comparison",
-                "content": "Key differences will be highlighted."
-            },
-            "concept-map": {
-                "heading": "Concept Overview",
-                "content": "Relationships between concepts will be shown."
-            },
-            "summary": {
-                "heading": "Summary",
-                "content": "Key takeaways from this lesson."
-            }
-        }
-        
         # Use template fallback first, then generic fallback
-        slide_fallback = template_fallback if template_fallback else generic_fallback.get(
-            slide_structure.content_type, {
-                "heading": "Content",
-                "content": "Content will be provided."
-            }
+        slide_fallback = template_fallback if template_fallback else _GENERIC_SLIDE_FALLBACKS.get(
+            slide_structure.content_type, _DEFAULT_GENERIC_SLIDE_FALLBACK
         )
         
         # Add fallback for empty or missing content
@@ -612,19 +706,23 @@ class AITutorService:
         # TODO: Integrate with actual audio engine when TTS is available
         
         audio_segments = []
-        current_time = 0.0
+        # Accumulate in whole milliseconds, as the audio merger does, so offsets do not
+        # drift from repeated float additions and subtractions
+        crossfade_ms = round(self.crossfade_duration * 1000)
+        current_time_ms = 0
         
         for slide in slides:
             if slide.narration:
+                duration_ms = round(slide.estimated_duration * 1000)
                 segment = {
                     "slide_number": slide.slide_number,
                     "text": slide.narration,
-                    "start_time": current_time,
+                    "start_time": current_time_ms / 1000.0,
                     "duration": slide.estimated_duration,
-                    "end_time": current_time + slide.estimated_duration
+                    "end_time": (current_time_ms + duration_ms) / 1000.0
                 }
                 audio_segments.append(segment)
-                current_time += slide.estimated_duration - self.crossfade_duration
+                current_time_ms += duration_ms - crossfade_ms
         
         total_duration = audio_segments[-1]["end_time"] if audio_segments else 0.0
         
@@ -1,4 +1,5 @@
 import httpx
+import orjson
 import asyncio
 import logging
 from typing import Dict, Any
@@ -22,7 +23,7 @@ class ConnectionService:
                 response = await client.get(f"{ollama_url}/api/tags")
 
                 if response.status_code == 200:
-                    models = response.json()
+                    models = orjson.loads(response.content)
                     return {
                         "status": "connected",
                         "url": ollama_url,
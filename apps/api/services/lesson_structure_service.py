@@ -14,16 +14,141 @@ This service generates structured educational lessons using the 9-section format
 
 Each section maps to specific templates and includes LLM content generation.
 """
-import json
+import asyncio
+import copy
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+from types import MappingProxyType
+from typing import Callable, Dict, List, Any, Mapping, Optional, Tuple
 from dataclasses import dataclass
+from pydantic import BaseModel, TypeAdapter, ValidationError, field_validator, model_validator
 from services.template_service import template_service
 from services.ollama_service import ollama_service
+from utils.ttl_cache import TTLCache
+from utils.json_extraction import extract_json_from_markdown, find_json_value
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Partial JSON parsing (pydantic >= 2.7, pinned in requirements.txt) lets batched analyses resolve
+# each topic as soon as its array element has streamed in; older versions wait for the full response
+try:
+    from pydantic_core import from_json as _from_json
+    _from_json("[", allow_partial=True)
+    PARTIAL_JSON_AVAILABLE = True
+except Exception:
+    PARTIAL_JSON_AVAILABLE = False
+
+# Sections used for shorter lessons, as (exclusive upper bound in seconds, content types).
+# Lessons at or above the last bound use all 9 sections.
+_DURATION_TIERS = (
+    # Short lessons: core sections only
+    (90, ("title-objective", "definition", "examples", "mini-recap")),
+    # Medium lessons: add context and common mistakes
+    (180, ("title-objective", "context-motivation", "definition",
+           "examples", "common-mistakes", "mini-recap")),
+)
+
+# Bump when section selection or timing logic changes so cached lesson plans are not reused
+_STRUCTURE_CACHE_VERSION = 1
+
+# Topic analysis instructions are sent as Ollama system prompts. They are byte-identical across
+# calls so Ollama can reuse its cached evaluation; only the short input varies per request.
+_TOPIC_ANALYSIS_RUBRIC = """You are an educational designer planning a 9-section lesson:
+1. Title + Objective
+2. Context / Motivation
+3. Analogy
+4. Definition
+5. Step-by-step Explanation / Theory
+6. Examples
+7. Common mistakes
+8. Mini Recap
+9. Some things to ponder
+
+Analyze:
+1. Topic complexity (1-5 scale)
+2. Key concepts to cover
+3. Best teaching approach
+4. What analogies might work well
+5. Common misconceptions students have
+6. Real-world applications/motivation
+7. Practical examples that would help
+"""
+
+_TOPIC_ANALYSIS_SCHEMA = """{
+    "complexity": 3,
+    "key_concepts": ["concept1", "concept2"],
+    "teaching_approach": "visual",
+    "good_analogies": ["analogy suggestion"],
+    "common_misconceptions": ["misconception1"],
+    "real_world_relevance": "why this matters",
+    "good_examples": ["example1", "example2"],
+    "strategy": "structured",
+    "reasoning": "analysis explanation"
+}"""
+
+TOPIC_ANALYSIS_SYSTEM_PROMPT = (
+    _TOPIC_ANALYSIS_RUBRIC
+    + "\nRespond in JSON format:\n"
+    + _TOPIC_ANALYSIS_SCHEMA
+)
+
+TOPIC_ANALYSIS_BATCH_SYSTEM_PROMPT = (
+    _TOPIC_ANALYSIS_RUBRIC
+    + "\nAnalyze every topic listed in the input. Respond with a JSON array containing exactly "
+    + "one object per topic, in the same order, each in this format:\n"
+    + _TOPIC_ANALYSIS_SCHEMA
+)
+
+class TopicAnalysis(BaseModel):
+    """Schema of the LLM topic analysis, validated straight from the response JSON"""
+    complexity: int = 3
+    key_concepts: List[str] = []
+    teaching_approach: str = ""
+    good_analogies: List[str] = []
+    common_misconceptions: List[str] = []
+    real_world_relevance: str = ""
+    good_examples: List[str] = []
+    strategy: str = "structured"
+    reasoning: str = ""
+
+    # LLM output is loosely typed; these fix-ups run inside validation instead of in a
+    # separate pass over the parsed dict
+
+    @model_validator(mode='before')
+    @classmethod
+    def drop_null_fields(cls, data):
+        """Treat null fields as missing, so their defaults apply instead of failing validation"""
+        if isinstance(data, dict):
+            return {key: value for key, value in data.items() if value is not None}
+        return data
+
+    @field_validator('complexity', mode='before')
+    @classmethod
+    def clamp_complexity(cls, v):
+        """Accept numeric strings and floats, clamped to the 1-5 scale"""
+        try:
+            return min(5, max(1, round(float(v))))
+        except (TypeError, ValueError):
+            return 3
+
+    @field_validator('teaching_approach', 'strategy', mode='before')
+    @classmethod
+    def normalize_keyword(cls, v):
+        """Compare keywords case-insensitively, as template scoring does"""
+        return v.strip().lower() if isinstance(v, str) else v
+
+    @field_validator('key_concepts', 'good_analogies', 'common_misconceptions', 'good_examples', mode='before')
+    @classmethod
+    def coerce_string_list(cls, v):
+        """Wrap a bare string in a list and drop empty or non-scalar items"""
+        if isinstance(v, str):
+            return [v] if v.strip() else []
+        if isinstance(v, list):
+            return [str(item) for item in v if isinstance(item, (str, int, float)) and str(item).strip()]
+        return v
+
+_TOPIC_ANALYSIS_LIST = TypeAdapter(List[TopicAnalysis])
+
+@dataclass(slots=True)
 class SlideStructure:
     """Structure for individual slide"""
     slide_number: int
@@ -35,7 +160,7 @@ class SlideStructure:
     layout_hints: Dict[str, Any]
     priority: int  # 1=essential, 2=important, 3=optional
 
-@dataclass
+@dataclass(slots=True)
 class LessonStructure:
     """Complete lesson structure"""
     topic: str
@@ -135,11 +260,39 @@ class LessonStructureService:
             }
         ]
         
+        # Section configs are shared by every lesson plan (and the duration tiers below),
+        # so expose them read-only rather than copying them per request
+        self.lesson_sections = [MappingProxyType(section) for section in self.lesson_sections]
+        
+        # Single content-type -> section mapping (template id, name, timing, priority)
+        self.sections_by_type: Dict[str, Mapping[str, Any]] = {
+            section["content_type"]: section for section in self.lesson_sections
+        }
+        
+        # Resolve the duration tiers to section configs once
+        self.duration_tiers: List[Tuple[float, List[Mapping[str, Any]]]] = [
+            (limit, [self.sections_by_type[content_type] for content_type in content_types])
+            for limit, content_types in _DURATION_TIERS
+        ]
+        
         self.difficulty_multipliers = {
             "beginner": 0.8,      # Shorter, simpler explanations
             "intermediate": 1.0,   # Standard timing
             "advanced": 1.3       # More detailed, longer explanations
         }
+        
+        # Topic analyses requested within a short window are coalesced into one LLM call
+        self.analysis_batch_window = 0.05  # seconds
+        self.analysis_batch_size = 8
+        self._analysis_queue: Optional[asyncio.Queue] = None
+        self._analysis_worker: Optional[asyncio.Task] = None
+        self._analysis_dispatches = set()
+        
+        # Responses larger than this are extracted and parsed in a worker thread
+        self.json_offload_threshold = 8192
+        
+        # Complete lesson plans keyed on normalized (topic, difficulty, duration)
+        self._structure_cache = TTLCache(maxsize=1024, ttl=3600)
     
     async def analyze_topic_structure(
         self, 
@@ -148,6 +301,16 @@ class LessonStructureService:
         target_duration: float
     ) -> LessonStructure:
         """Generate structured 9-section lesson for the given topic"""
+        cache_key = (
+            topic.strip().lower(), difficulty_level, float(target_duration), _STRUCTURE_CACHE_VERSION
+        )
+        cached_structure = self._structure_cache.get(cache_key)
+        if cached_structure is not None:
+            logger.info(f"Reusing cached lesson structure for: {topic}")
+            structure = copy.deepcopy(cached_structure)
+            structure.topic = topic
+            return structure
+        
         logger.info(f"Generating 9-section lesson structure for: {topic}")
         
         # Get topic analysis to inform content generation
@@ -161,13 +324,13 @@ class LessonStructureService:
         )
         
         # Generate slide structures for selected sections
-        slide_structures = await self._generate_slide_structures(
+        slide_structures = self._generate_slide_structures(
             topic, difficulty_level, target_duration, selected_sections, topic_analysis
         )
         
         total_duration = sum(slide.estimated_duration for slide in slide_structures)
         
-        return LessonStructure(
+        structure = LessonStructure(
             topic=topic,
             difficulty_level=difficulty_level,
             total_slides=len(slide_structures),
@@ -176,58 +339,179 @@ class LessonStructureService:
             teaching_strategy=topic_analysis.get("strategy", "structured"),
             content_flow=[slide.content_type for slide in slide_structures]
         )
+        
+        # Heuristic plans are not cached so the next request retries the LLM analysis
+        if not topic_analysis.get("is_fallback"):
+            self._structure_cache.set(cache_key, copy.deepcopy(structure))
+        
+        return structure
+    
+    async def analyze_topic_structures(
+        self,
+        topics: List[str],
+        difficulty_level: str,
+        target_duration: float
+    ) -> List[LessonStructure]:
+        """Generate lesson structures for several topics at once (e.g. a curriculum)
+        
+        The topic analyses are submitted together, so the analysis batcher sends them to
+        Ollama as one batched request (up to analysis_batch_size topics per call).
+        """
+        return list(await asyncio.gather(*(
+            self.analyze_topic_structure(topic, difficulty_level, target_duration)
+            for topic in topics
+        )))
     
     async def _analyze_topic_for_sections(
         self, topic: str, difficulty_level: str, target_duration: float
     ) -> Dict[str, Any]:
-        """Analyze topic to inform 9-section lesson structure"""
-        prompt = f"""
-        Analyze the educational topic "{topic}" for a {difficulty_level} level lesson.
-        Target duration: {target_duration} seconds.
-        
-        This will be structured as a 9-section lesson:
-        1. Title + Objective
-        2. Context / Motivation  
-        3. Analogy
-        4. Definition
-        5. Step-by-step Explanation / Theory
-        6. Examples
-        7. Common mistakes
-        8. Mini Recap
-        9. Some things to ponder
-        
-        Analyze:
-        1. Topic complexity (1-5 scale)
-        2. Key concepts to cover
-        3. Best teaching approach
-        4. What analogies might work well
-        5. Common misconceptions students have
-        6. Real-world applications/motivation
-        7. Practical examples that would help
-        
-        Respond in JSON format:
-        {{
-            "complexity": 3,
-            "key_concepts": ["concept1", "concept2"],
-            "teaching_approach": "visual", 
-            "good_analogies": ["analogy suggestion"],
-            "common_misconceptions": ["misconception1"],
-            "real_world_relevance": "why this matters",
-            "good_examples": ["example1", "example2"],
-            "strategy": "structured",
-            "reasoning": "analysis explanation"
-        }}
-        """
+        """Analyze topic to inform 9-section lesson structure, batched with concurrent requests"""
+        if self._analysis_worker is None or self._analysis_worker.done():
+            self._analysis_queue = asyncio.Queue()
+            self._analysis_worker = asyncio.create_task(self._run_analysis_batcher())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._analysis_queue.put(((topic, difficulty_level, target_duration), future))
+        return await future
+    
+    async def _run_analysis_batcher(self) -> None:
+        """Collect topic analyses arriving within the batch window and dispatch them together"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._analysis_queue.get()]
+            deadline = loop.time() + self.analysis_batch_window
+            
+            while len(batch) < self.analysis_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._analysis_queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Dispatch without blocking so the next window keeps collecting
+            task = asyncio.create_task(self._dispatch_analysis_batch(batch))
+            self._analysis_dispatches.add(task)
+            task.add_done_callback(self._analysis_dispatches.discard)
+    
+    async def _dispatch_analysis_batch(
+        self, batch: List[Tuple[Tuple[str, str, float], asyncio.Future]]
+    ) -> None:
+        """Run one batch of topic analyses and resolve the waiting callers"""
+        items = [item for item, _ in batch]
+        
+        def resolve_early(index: int, result: Any) -> None:
+            if index >= len(batch) or batch[index][1].done():
+                return
+            try:
+                analysis = TopicAnalysis.model_validate(result)
+            except ValidationError:
+                # Left for the full response, which falls back per topic
+                return
+            batch[index][1].set_result(analysis.model_dump(exclude_unset=True))
+        
+        try:
+            if len(items) == 1:
+                results = [await self._analyze_single_topic(*items[0])]
+            else:
+                results = await self._analyze_topics_batch(items, on_result=resolve_early)
+        except Exception as e:
+            logger.warning(f"Batched topic analysis failed: {e}")
+            results = [self._fallback_topic_analysis(topic, difficulty) for topic, difficulty, _ in items]
+        
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+    
+    async def _analyze_topics_batch(
+        self,
+        items: List[Tuple[str, str, float]],
+        on_result: Optional[Callable[[int, Any], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """Analyze several topics with one LLM call returning a JSON array, reporting elements early to on_result"""
+        numbered_topics = "\n".join(
+            f'{index}. Topic: "{topic}" | Level: {difficulty_level} | Target duration: {target_duration} seconds'
+            for index, (topic, difficulty_level, target_duration) in enumerate(items, 1)
+        )
+        prompt = "INPUT:\n" + numbered_topics + "\n"
+        
+        on_token = None
+        if on_result and PARTIAL_JSON_AVAILABLE:
+            on_token = self._make_partial_array_listener(on_result)
+        
+        response = await ollama_service._make_request(
+            prompt, "system", on_token=on_token, system=TOPIC_ANALYSIS_BATCH_SYSTEM_PROMPT
+        )
+        results = None
+        if response:
+            try:
+                results = await self._parse_llm_json_offloaded(response, expect_array=True)
+            except ValidationError:
+                results = None
+        
+        # The parser already returns validated TopicAnalysis dicts; only the count needs checking
+        if results is None or len(results) != len(items):
+            logger.warning(f"Batched topic analysis unusable for {len(items)} topics, analyzing individually")
+            return list(await asyncio.gather(
+                *(self._analyze_single_topic(*item) for item in items)
+            ))
+        
+        return results
+    
+    def _make_partial_array_listener(
+        self, on_result: Callable[[int, Any], None]
+    ) -> Callable[[str], None]:
+        """Build an on_token callback that reports each streamed JSON array element once complete"""
+        parts: List[str] = []
+        emitted = 0
+        array_started = False
+        
+        def on_token(token: str) -> None:
+            nonlocal emitted, array_started
+            parts.append(token)
+            # An element completes on a closing brace and is confirmed once the next one opens
+            if "}" not in token and "{" not in token:
+                return
+            
+            text = "".join(parts)
+            if not array_started:
+                start_idx = text.find("[")
+                if start_idx == -1:
+                    return
+                # Drop any preamble once, so later joins already start at the array
+                text = text[start_idx:]
+                parts[:] = [text]
+                array_started = True
+            try:
+                elements = _from_json(text, allow_partial=True)
+            except ValueError:
+                return
+            if not isinstance(elements, list):
+                return
+            
+            # The last element may still be streaming; it is reported with the full response
+            while emitted < len(elements) - 1:
+                on_result(emitted, elements[emitted])
+                emitted += 1
+        
+        return on_token
+    
+    async def _analyze_single_topic(
+        self, topic: str, difficulty_level: str, target_duration: float
+    ) -> Dict[str, Any]:
+        """Analyze a single topic with its own LLM call"""
+        prompt = f'INPUT:\nTopic: "{topic}"\nLevel: {difficulty_level}\nTarget duration: {target_duration} seconds\n'
         
         try:
-            response = await ollama_service._make_request(prompt, "system")
+            response = await ollama_service._make_request(
+                prompt, "system", system=TOPIC_ANALYSIS_SYSTEM_PROMPT
+            )
             
             if response:
                 try:
-                    # Clean up markdown code blocks if present
-                    cleaned_content = self._extract_json_from_markdown(response)
-                    return json.loads(cleaned_content)
-                except json.JSONDecodeError:
+                    return await self._parse_llm_json_offloaded(response)
+                except ValidationError:
                     logger.warning(f"Failed to parse LLM response as JSON: {response[:100]}...")
                     return self._fallback_topic_analysis(topic, difficulty_level)
             else:
@@ -237,6 +521,29 @@ class LessonStructureService:
             logger.warning(f"LLM topic analysis failed: {e}")
             return self._fallback_topic_analysis(topic, difficulty_level)
     
+    def _parse_llm_json(self, content: str, expect_array: bool = False) -> Any:
+        """Extract the topic analysis object (or array) from an LLM response and validate it
+        
+        The JSON is parsed and validated against TopicAnalysis in a single pass; fields the
+        LLM left out stay unset so callers' .get() defaults still apply.
+        """
+        if expect_array:
+            content = find_json_value(content, '[') or content
+            return [
+                analysis.model_dump(exclude_unset=True)
+                for analysis in _TOPIC_ANALYSIS_LIST.validate_json(content)
+            ]
+        
+        # Clean up markdown code blocks if present
+        json_content = self._extract_json_from_markdown(content)
+        return TopicAnalysis.model_validate_json(json_content).model_dump(exclude_unset=True)
+    
+    async def _parse_llm_json_offloaded(self, content: str, expect_array: bool = False) -> Any:
+        """Parse LLM JSON, moving large responses off the event loop"""
+        if len(content) > self.json_offload_threshold:
+            return await asyncio.to_thread(self._parse_llm_json, content, expect_array)
+        return self._parse_llm_json(content, expect_array)
+    
     def _fallback_topic_analysis(self, topic: str, difficulty_level: str) -> Dict[str, Any]:
         """Fallback topic analysis when LLM fails"""
         complexity_map = {"beginner": 2, "intermediate": 3, "advanced": 4}
@@ -250,57 +557,45 @@ class LessonStructureService:
             "real_world_relevance": f"{topic} helps us understand everyday phenomena",
             "good_examples": [f"A common example of {topic} is..."],
             "strategy": "structured",
-            "reasoning": "Fallback analysis based on heuristics"
+            "reasoning": "Fallback analysis based on heuristics",
+            "is_fallback": True
         }
     
     def _select_sections_for_duration(
         self, target_duration: float, difficulty_level: str, topic_analysis: Dict[str, Any]
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Mapping[str, Any]]:
         """Select which lesson sections to include based on target duration"""
-        
-        # For short lessons (< 90 seconds), use core sections only
-        if target_duration < 90:
-            core_sections = ["title-objective", "definition", "examples", "mini-recap"]
-            return [section for section in self.lesson_sections 
-                   if section["content_type"] in core_sections]
-        
-        # For medium lessons (90-180 seconds), add context and analogy
-        elif target_duration < 180:
-            medium_sections = ["title-objective", "context-motivation", "definition", 
-                             "examples", "common-mistakes", "mini-recap"]
-            return [section for section in self.lesson_sections 
-                   if section["content_type"] in medium_sections]
+        for limit, sections in self.duration_tiers:
+            if target_duration < limit:
+                return list(sections)
         
         # For longer lessons (180+ seconds), use all 9 sections
-        else:
-            return self.lesson_sections.copy()
+        return self.lesson_sections.copy()
     
-    async def _generate_slide_structures(
+    def _generate_slide_structures(
         self, 
         topic: str, 
         difficulty_level: str, 
         target_duration: float,
-        selected_sections: List[Dict[str, Any]], 
+        selected_sections: List[Mapping[str, Any]], 
         topic_analysis: Dict[str, Any]
     ) -> List[SlideStructure]:
         """Generate slide structures for selected sections"""
         
         slides = []
-        difficulty_multiplier = self.difficulty_multipliers.get(difficulty_level, 1.0)
+        total_slides = len(selected_sections)
         
-        # Calculate total base duration for scaling
-        total_base_duration = sum(
-            section["base_duration"] * difficulty_multiplier 
-            for section in selected_sections
-        )
+        # Read each section's base duration once and derive the total from the same list.
+        # The difficulty multiplier scales every section and the total alike, so it cancels
+        # out once durations are fitted to the target.
+        base_durations = [section["base_duration"] for section in selected_sections]
+        total_base_duration = sum(base_durations)
         
-        # Scale durations to fit target
+        # Scale durations to fit target in a single pass (minimum 8 seconds per slide)
         duration_scale = target_duration / total_base_duration if total_base_duration > 0 else 1.0
+        scaled_durations = [max(8.0, base * duration_scale) for base in base_durations]
         
-        for i, section in enumerate(selected_sections):
-            base_duration = section["base_duration"] * difficulty_multiplier
-            scaled_duration = base_duration * duration_scale
-            
+        for i, (section, scaled_duration) in enumerate(zip(selected_sections, scaled_durations)):
             # Intelligently select the best template for this section
             selected_template = self._select_optimal_template(
                 section, topic, difficulty_level, topic_analysis
@@ -316,11 +611,11 @@ class LessonStructureService:
                 template_id=selected_template["id"],
                 template_name=selected_template["name"],
                 content_type=section["content_type"],
-                estimated_duration=max(8.0, scaled_duration),  # Minimum 8 seconds
+                estimated_duration=scaled_duration,
                 content_prompts=content_prompts,
                 layout_hints={
                     "slide_position": i,
-                    "total_slides": len(selected_sections),
+                    "total_slides": total_slides,
                     "section_description": section["description"],
                     "template_variant": selected_template.get("templateVariant", 1)
                 },
@@ -332,7 +627,7 @@ class LessonStructureService:
     
     def _select_optimal_template(
         self, 
-        section: Dict[str, Any], 
+        section: Mapping[str, Any], 
         topic: str, 
         difficulty_level: str, 
         topic_analysis: Dict[str, Any]
@@ -425,45 +720,13 @@ class LessonStructureService:
             "content": f"{base_context} Create relevant content for {section_type} about {topic}."
         })
     
-    def _get_section_by_type(self, content_type: str) -> Optional[Dict[str, Any]]:
+    def _get_section_by_type(self, content_type: str) -> Optional[Mapping[str, Any]]:
         """Get section configuration by content type"""
-        for section in self.lesson_sections:
-            if section["content_type"] == content_type:
-                return section
-        return None
+        return self.sections_by_type.get(content_type)
     
     def _extract_json_from_markdown(self, content: str) -> str:
         """Extract JSON content from markdown code blocks"""
-        import re
-        
-        # Remove leading/trailing whitespace
-        content = content.strip()
-        
-        # Pattern to match markdown code blocks with optional language identifier
-        # Matches: ```json\n{...}\n``` or ```\n{...}\n```
-        markdown_pattern = r'```(?:json)?\s*\n?(.*?)\n?```'
-        
-        # Try to find JSON in markdown code blocks
-        matches = re.findall(markdown_pattern, content, re.DOTALL | re.IGNORECASE)
-        if matches:
-            # Use the first match (largest code block)
-            json_content = matches[0].strip()
-            logger.debug(f"Extracted JSON from markdown: {json_content[:100]}...")
-            return json_content
-        
-        # If no markdown blocks found, try to extract JSON-like content
-        # Look for content between first { and last }
-        start_idx = content.find('{')
-        end_idx = content.rfind('}')
-        
-        if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-            json_content = content[start_idx:end_idx + 1]
-            logger.debug(f"Extracted JSON from braces: {json_content[:100]}...")
-            return json_content
-        
-        # Return original content if no extraction possible
-        logger.debug("No JSON extraction possible, returning original content")
-        return content
+        return extract_json_from_markdown(content)
 
 # Global instance
 lesson_structure_service = LessonStructureService()
\ No newline at end of file
@@ -1,92 +1,70 @@
 import asyncio
+import hashlib
 import logging
+import random
+import re
 import httpx
-from typing import Dict, List, Optional, AsyncGenerator, Tuple
+import orjson
+from contextlib import aclosing
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, AsyncGenerator, Tuple
 from config import settings
 from models.lesson import CanvasStep
 from models.settings import UserSettings
+from utils.ttl_cache import TTLCache
+from utils.json_extraction import extract_json_from_markdown
 
 logger = logging.getLogger(__name__)
 
-# Import chunked generation components - moved after logger definition
-# Note: chunked_content_generator moved to unused-code/
-try:
-    from templates.timeline_prompts import ContentType, DifficultyLevel
-    CHUNKED_GENERATION_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"Chunked generation not available: {e}")
-    CHUNKED_GENERATION_AVAILABLE = False
+# Matches "Step N: Title" headers in generated lesson scripts
+_STEP_RE = re.compile(r'^[ \t]*Step[ \t]+(\d+)[ \t]*:[ \t]*(.*)$', re.MULTILINE)
 
+# Matches the EXPLANATION:/NARRATION:/VISUAL_ELEMENTS: labels inside a step body
+_FIELD_RE = re.compile(r'^[ \t]*(EXPLANATION|NARRATION|VISUAL_ELEMENTS)[ \t]*:', re.MULTILINE)
 
-class OllamaService:
-    """Service for interacting with Ollama AI model"""
+
+def _iter_sections(pattern: re.Pattern, text: str):
+    """Yield (header match, body) for each header found by pattern, preceded by (None, preamble)"""
+    previous = None
+    start = 0
+    for match in pattern.finditer(text):
+        yield previous, text[start:match.start()]
+        previous, start = match, match.end()
+    yield previous, text[start:]
+
+# Statuses Ollama (or a proxy in front of it) returns when it is at capacity
+_OVERLOADED_STATUS_CODES = frozenset({429, 503})
+
+
+class OllamaOverloadedError(Exception):
+    """Raised inside the request retry loop when Ollama reports it is at capacity"""
     
-    def __init__(self):
-        self.base_url = settings.get_ollama_url()
-        self.model = "gemma3n:latest"  # Use the available model
-        self.timeout = 60.0
-        
-        # Chunked content generator moved to unused-code during refactoring
-        # Chunked generation functionality disabled for now
-        self.chunked_generator = None
-        
-    async def _make_request(self, prompt: str, user_id: str = "default") -> Optional[str]:
-        """Make a request to Ollama API with user settings"""
-        try:
-            # Get user's LLM settings
-            user_settings = await UserSettings.find_one(UserSettings.user_id == user_id)
-            llm_settings = user_settings.llm if user_settings else None
-            
-            # Use settings or defaults
-            model = llm_settings.model if llm_settings else self.model
-            temperature = 0.7  # Default temperature
-            max_tokens = 16384  # Default max tokens (16k)
-            
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/generate",
-                    json={
-                        "model": model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "options": {
-                            "temperature": temperature,
-                            "num_predict": max_tokens,
-                        }
-                    }
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    response_text = result.get("response", "")
-                    if not response_text or response_text.strip() == "":
-                        logger.warning(f"Empty response from Ollama for prompt: {prompt[:50]}...")
-                        logger.debug(f"Full Ollama response: {result}")
-                    return response_text
-                else:
-                    logger.error(f"Ollama API error: {response.status_code} - {response.text}")
-                    return None
-                    
-        except httpx.RequestError as e:
-            logger.error(f"Request error: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Unexpected error: {e}", exc_info=True)
-            return None
+    def __init__(self, status_code: int, retry_after: Optional[float] = None):
+        super().__init__(f"Ollama is overloaded (HTTP {status_code})")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class OllamaAPIError(Exception):
+    """Raised for non-retryable error statuses from the generate endpoint"""
     
-    async def generate_eli5_lesson(self, topic: str, difficulty_level: str = "beginner", user_id: str = "default") -> Optional[List[CanvasStep]]:
-        """Generate ELI5 lesson steps for a given topic"""
-        
-        difficulty_prompts = {
-            "beginner": "Explain this like I'm 5 years old, using very simple language and examples",
-            "intermediate": "Explain this at a middle school level with clear examples",
-            "advanced": "Explain this at a high school level with detailed examples"
-        }
-        
-        difficulty_instruction = difficulty_prompts.get(difficulty_level, difficulty_prompts["beginner"])
-        
-        prompt = f"""
-{difficulty_instruction}. Break down the topic "{topic}" into exactly 5 clear, sequential steps that build upon each other.
+    def __init__(self, status_code: int, body: str):
+        super().__init__(f"Ollama API error: {status_code} - {body}")
+        self.status_code = status_code
+        self.body = body
+
+
+class LessonStreamInterrupted(Exception):
+    """Raised when a streamed lesson stops before the model finished it"""
+
+
+# Fallback speech timing: 150 words per minute plus a 30% buffer for pauses and TTS processing
+_WORD_RE = re.compile(r'\S+')
+_SECONDS_PER_WORD = 60 / 150 * 1.3
+
+# Lesson generation prompts: the long static instructions come first and the per-request
+# topic/audience last, so requests share the longest possible prefix for Ollama's prompt cache
+ELI5_LESSON_PROMPT = """Break down the topic given at the end into exactly 5 clear, sequential steps that build upon each other.
 
 For each step, provide:
 1. A clear, engaging title
@@ -125,98 +103,538 @@ NARRATION: [Script for voice-over, conversational tone, 20-40 words for natural
 
 Keep each step concise but informative, and make sure the progression is logical and easy to follow. The narration should be engaging and sound natural when spoken aloud. Focus on natural speech patterns and comfortable pacing.
 """
+
+VISUAL_SCRIPT_PROMPT = """Create a visual lesson script for the topic given at the end that can be drawn step-by-step on a whiteboard or canvas.
+
+Break this into exactly 5 sequential steps that build upon each other visually. For each step:
+1. Provide a clear, engaging title
+2. Write explanation text for reading
+3. Write narration script that sounds natural when spoken (conversational, engaging)
+4. Describe what visual elements should be drawn (shapes, arrows, text, diagrams)
+
+TTS-AWARE NARRATION GUIDELINES:
+- Target 140-160 words per minute speaking rate
+- Write for natural speech: use contractions, shorter sentences
+- Each narration should be 20-40 words for 15-30 second duration
+- Avoid complex punctuation that doesn't translate to speech
+- Include natural pauses and emphasis points
+- Consider pronunciation of technical terms
+
+Think about visual concepts like:
+- Simple shapes (rectangles, circles, arrows)
+- Flow diagrams and connections
+- Labels and annotations
+- Progressive building of concepts
+- Clear visual metaphors and analogies
+
+Format your response as follows:
+Step 1: [Title]
+EXPLANATION: [Detailed explanation for reading]
+NARRATION: [Script for voice-over - natural, conversational tone, 20-40 words]
+VISUAL_ELEMENTS: [Describe what to draw: shapes, text, arrows, positioning]
+
+Step 2: [Title]
+EXPLANATION: [Detailed explanation for reading]
+NARRATION: [Script for voice-over - natural, conversational tone, 20-40 words]
+VISUAL_ELEMENTS: [Describe what to draw: shapes, text, arrows, positioning]
+
+[Continue for all 5 steps...]
+
+Focus on topics that can be effectively visualized through simple drawings. Make the narration engaging and the visual descriptions clear enough that someone could recreate the drawings.
+"""
+
+# Audience instructions per difficulty for each lesson prompt kind
+_LESSON_AUDIENCES = {
+    "lesson": {
+        "beginner": "Explain this like I'm 5 years old, using very simple language and examples",
+        "intermediate": "Explain this at a middle school level with clear examples",
+        "advanced": "Explain this at a high school level with detailed examples"
+    },
+    "visual": {
+        "beginner": "Explain this like I'm 5 years old, using very simple language and visual examples",
+        "intermediate": "Explain this at a middle school level with clear visual demonstrations",
+        "advanced": "Explain this at a high school level with detailed visual explanations"
+    }
+}
+
+_LESSON_PROMPTS = {
+    "lesson": ELI5_LESSON_PROMPT,
+    "visual": VISUAL_SCRIPT_PROMPT
+}
+
+
+@lru_cache(maxsize=512)
+def _build_lesson_prompt(kind: str, topic: str, difficulty_level: str) -> str:
+    """Build the full prompt for a lesson kind, memoized for repeated topics"""
+    audiences = _LESSON_AUDIENCES[kind]
+    difficulty_instruction = audiences.get(difficulty_level, audiences["beginner"])
+    return _LESSON_PROMPTS[kind] + f'\nTopic: "{topic}"\nAudience: {difficulty_instruction}.\n'
+
+# aiohttp is an alternative transport for generation requests (OLLAMA_HTTP_BACKEND=aiohttp)
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    aiohttp = None
+    AIOHTTP_AVAILABLE = False
+
+# Connection failures and timeouts worth retrying, for whichever HTTP backend is in use
+_RETRYABLE_ERRORS = (httpx.RequestError, OllamaOverloadedError)
+if AIOHTTP_AVAILABLE:
+    _RETRYABLE_ERRORS += (aiohttp.ClientError, asyncio.TimeoutError)
+
+# Import chunked generation components - moved after logger definition
+# Note: chunked_content_generator moved to unused-code/
+try:
+    from templates.timeline_prompts import ContentType, DifficultyLevel
+    CHUNKED_GENERATION_AVAILABLE = True
+except ImportError as e:
+    logger.warning(f"Chunked generation not available: {e}")
+    CHUNKED_GENERATION_AVAILABLE = False
+
+
+class OllamaService:
+    """Service for interacting with Ollama AI model"""
+    
+    def __init__(self):
+        self.base_url = settings.get_ollama_url()
+        self.model = "gemma3n:latest"  # Use the available model
+        self.timeout = 60.0
         
-        response = await self._make_request(prompt, user_id)
+        # Generation requests fail fast and retry: connect errors surface after 5s and,
+        # since responses are streamed, the read timeout bounds the gap between tokens
+        self.max_retries = 3
+        self.per_attempt_timeout = httpx.Timeout(float(settings.ollama_timeout), connect=5.0)
         
-        if not response:
+        # Generation options sent with every request (shared, never mutated per call)
+        self._default_options = {
+            "temperature": 0.7,
+            "num_predict": 16384,  # 16k max tokens
+        }
+        
+        # Keep concurrent generations within what the server runs in parallel (OLLAMA_NUM_PARALLEL);
+        # anything beyond that would only queue inside Ollama and inflate tail latency
+        self._request_slots = asyncio.Semaphore(settings.ollama_max_parallel)
+        
+        # Exact-match cache of generated text keyed on the full request, plus parsed steps
+        # for repeated responses so cache hits also skip reparsing
+        self._response_cache = TTLCache(maxsize=512, ttl=3600)
+        self._steps_cache = TTLCache(maxsize=256, ttl=3600)
+        
+        # Short-lived per-user LLM settings lookups, cached as tasks so concurrent requests
+        # for the same user share a single MongoDB query; the settings router invalidates on writes
+        self._llm_settings_cache = TTLCache(maxsize=256, ttl=30)
+        
+        # Generations currently running, keyed like the response cache, so identical
+        # concurrent requests wait for one Ollama call instead of issuing duplicates
+        self._inflight: Dict[str, asyncio.Future] = {}
+        
+        # Long-lived pooled client, created on first use so requests reuse keep-alive connections
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        # Generation requests can optionally go through a pooled aiohttp session instead
+        self.http_backend = settings.ollama_http_backend
+        if self.http_backend == "aiohttp" and not AIOHTTP_AVAILABLE:
+            logger.warning("aiohttp is not installed, using httpx for Ollama requests")
+            self.http_backend = "httpx"
+        self._aiohttp_session = None
+        
+        # Chunked content generator moved to unused-code during refactoring
+        # Chunked generation functionality disabled for now
+        self.chunked_generator = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client, creating it on first use or after shutdown"""
+        # Construction never awaits, so no lock is needed to keep this single-instance
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                http2=True,
+                limits=httpx.Limits(
+                    max_keepalive_connections=20,
+                    max_connections=40,
+                    keepalive_expiry=60
+                )
+            )
+        return self._client
+    
+    def _get_aiohttp_session(self):
+        """Get the shared aiohttp session used when OLLAMA_HTTP_BACKEND=aiohttp"""
+        if self._aiohttp_session is None or self._aiohttp_session.closed:
+            self._aiohttp_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=40, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=5.0,
+                    sock_read=float(settings.ollama_timeout)
+                )
+            )
+        return self._aiohttp_session
+        
+    async def _make_request(
+        self,
+        prompt: str,
+        user_id: str = "default",
+        on_token: Optional[Callable[[str], None]] = None,
+        system: Optional[str] = None
+    ) -> Optional[str]:
+        """Make a streaming request to Ollama API with user settings"""
+        try:
+            # Get user's LLM settings
+            llm_settings = await self._get_llm_settings(user_id)
+            
+            # Only the model is user-configurable; generation options are fixed defaults
+            model = llm_settings.model if llm_settings else self.model
+            
+            payload = {
+                "model": model,
+                "prompt": prompt,
+                "stream": True,
+                # Keep the model resident between requests so its cached prompt prefix is reused
+                "keep_alive": settings.ollama_keep_alive,
+                "options": self._default_options
+            }
+            if system:
+                # Static instructions go in the system prompt so identical prefixes stay cached
+                payload["system"] = system
+            
+            cache_key = hashlib.sha256(orjson.dumps({
+                "model": model,
+                "prompt": prompt,
+                "system": system,
+                "options": self._default_options,
+            }, option=orjson.OPT_SORT_KEYS)).hexdigest()
+            cached_response = self._response_cache.get(cache_key)
+            if cached_response is not None:
+                logger.debug(f"Ollama response cache hit for prompt: {prompt[:50]}...")
+                if on_token:
+                    on_token(cached_response)
+                return cached_response
+            
+            inflight = self._inflight.get(cache_key)
+            if inflight is not None:
+                # An identical generation is already running; share its result
+                logger.debug(f"Joining in-flight Ollama request for prompt: {prompt[:50]}...")
+                response_text = await asyncio.shield(inflight)
+                if on_token and response_text:
+                    on_token(response_text)
+                return response_text
+            
+            inflight = asyncio.get_running_loop().create_future()
+            self._inflight[cache_key] = inflight
+            response_text = None
+            try:
+                response_text = await self._stream_generate(orjson.dumps(payload), on_token)
+            finally:
+                del self._inflight[cache_key]
+                inflight.set_result(response_text)
+            
+            if response_text is None:
+                return None
+            if not response_text.strip():
+                logger.warning(f"Empty response from Ollama for prompt: {prompt[:50]}...")
+            else:
+                self._response_cache.set(cache_key, response_text)
+            return response_text
+                    
+        except Exception as e:
+            logger.error(f"Unexpected error: {e}", exc_info=True)
             return None
+    
+    async def _stream_generate(
+        self,
+        request_body: bytes,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> Optional[str]:
+        """POST a serialized generate request, retrying transient failures, and collect the streamed text"""
+        for attempt in range(self.max_retries):
+            parts: List[str] = []
+            try:
+                async with self._request_slots, aclosing(self._iter_generate_lines(request_body)) as lines:
+                    # Ollama streams NDJSON: one object per line with a partial "response"
+                    async for line in lines:
+                        chunk = orjson.loads(line)
+                        if chunk.get("error"):
+                            logger.error(f"Ollama stream error: {chunk['error']}")
+                            return None
+                        token = chunk.get("response", "")
+                        if token:
+                            parts.append(token)
+                            if on_token:
+                                on_token(token)
+                        if chunk.get("done"):
+                            break
+                break
+                    
+            except OllamaAPIError as e:
+                logger.error(str(e))
+                return None
+            except _RETRYABLE_ERRORS as e:
+                if parts and on_token:
+                    # Tokens were already forwarded; retrying would replay them
+                    logger.error(f"Ollama stream interrupted after partial output: {e}")
+                    return None
+                if attempt + 1 >= self.max_retries:
+                    logger.error(f"Ollama request failed after {self.max_retries} attempts: {e}")
+                    return None
+                delay = min(2 ** attempt + random.random(), 8.0)
+                if isinstance(e, OllamaOverloadedError) and e.retry_after is not None:
+                    delay = min(e.retry_after, 8.0)
+                logger.warning(
+                    f"Ollama request failed (attempt {attempt + 1}/{self.max_retries}): {e!r}, "
+                    f"retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
             
-        return self._parse_lesson_steps(response)
+        return "".join(parts)
     
-    def _parse_lesson_steps(self, response: str) -> List[CanvasStep]:
-        """Parse the Ollama response into CanvasStep objects with explanation and narration"""
-        steps = []
-        lines = response.strip().split('\n')
+    def _iter_generate_lines(self, request_body: bytes) -> AsyncGenerator:
+        """Stream the NDJSON lines of a generate request through the configured HTTP backend"""
+        if self.http_backend == "aiohttp":
+            return self._iter_generate_lines_aiohttp(request_body)
+        return self._iter_generate_lines_httpx(request_body)
+    
+    async def _iter_generate_lines_httpx(self, request_body: bytes) -> AsyncGenerator[str, None]:
+        """Stream generate response lines over the pooled httpx client"""
+        async with self._get_client().stream(
+            "POST",
+            "/api/generate",
+            content=request_body,
+            headers={"Content-Type": "application/json"},
+            timeout=self.per_attempt_timeout
+        ) as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                self._raise_for_generate_status(response.status_code, response.headers.get("retry-after"), body)
+            
+            async for line in response.aiter_lines():
+                if line:
+                    yield line
+    
+    async def _iter_generate_lines_aiohttp(self, request_body: bytes) -> AsyncGenerator[bytes, None]:
+        """Stream generate response lines over the pooled aiohttp session"""
+        async with self._get_aiohttp_session().post(
+            f"{self.base_url}/api/generate",
+            data=request_body,
+            headers={"Content-Type": "application/json"}
+        ) as response:
+            if response.status != 200:
+                body = await response.read()
+                self._raise_for_generate_status(response.status, response.headers.get("Retry-After"), body)
+            
+            # Split lines ourselves: the final chunk carries the whole context array and can
+            # exceed the StreamReader line limit
+            pending = bytearray()
+            async for data in response.content.iter_any():
+                # Grow the partial line in place; only re-split once a newline has arrived, so a
+                # long line spread over many reads is not copied and rescanned on every read
+                pending += data
+                if b"\n" not in data:
+                    continue
+                *lines, tail = pending.split(b"\n")
+                pending = bytearray(tail)
+                for line in lines:
+                    if line.strip():
+                        yield bytes(line)
+            if pending.strip():
+                yield bytes(pending)
+    
+    def _raise_for_generate_status(self, status_code: int, retry_after: Optional[str], body: bytes) -> None:
+        """Raise the retryable or fatal error matching a failed generate response"""
+        if status_code in _OVERLOADED_STATUS_CODES:
+            raise OllamaOverloadedError(status_code, self._parse_retry_after(retry_after))
+        raise OllamaAPIError(status_code, body.decode(errors="replace"))
+    
+    async def _get_llm_settings(self, user_id: str):
+        """Get a user's LLM settings, briefly cached to avoid a database lookup per generation"""
+        lookup = self._llm_settings_cache.get(user_id)
+        if lookup is None:
+            lookup = asyncio.ensure_future(UserSettings.find_one(UserSettings.user_id == user_id))
+            self._llm_settings_cache.set(user_id, lookup)
+        
+        try:
+            user_settings = await asyncio.shield(lookup)
+        except Exception:
+            # Don't cache failed lookups
+            if self._llm_settings_cache.get(user_id) is lookup:
+                self._llm_settings_cache.pop(user_id)
+            raise
+        return user_settings.llm if user_settings else None
+    
+    def invalidate_user_settings(self, user_id: str) -> None:
+        """Drop cached LLM settings for a user after their settings change"""
+        self._llm_settings_cache.pop(user_id)
+    
+    def _parse_retry_after(self, value: Optional[str]) -> Optional[float]:
+        """Parse a Retry-After header given in seconds"""
+        try:
+            return max(float(value), 0.0) if value else None
+        except ValueError:
+            return None
+    
+    async def generate_eli5_lesson(
+        self,
+        topic: str,
+        difficulty_level: str = "beginner",
+        user_id: str = "default",
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> Optional[List[CanvasStep]]:
+        """Generate ELI5 lesson steps for a given topic, optionally streaming raw tokens to on_token"""
         
-        current_step = None
-        current_explanation = []
-        current_narration = []
-        step_number = 1
-        parsing_mode = None  # 'explanation' or 'narration'
+        prompt = _build_lesson_prompt("lesson", topic, difficulty_level)
         
-        for line in lines:
-            line = line.strip()
+        response = await self._make_request(prompt, user_id, on_token=on_token)
+        
+        if not response:
+            return None
             
-            if line.startswith(f"Step {step_number}:"):
-                # Save previous step if exists
-                if current_step and (current_explanation or current_narration):
-                    explanation_text = '\n'.join(current_explanation).strip() if current_explanation else ""
-                    narration_text = '\n'.join(current_narration).strip() if current_narration else ""
-                    
-                    steps.append(CanvasStep(
-                        step_number=step_number - 1,
-                        title=current_step,
-                        explanation=explanation_text,
-                        content=explanation_text or narration_text,  # Legacy field for backward compatibility
-                        narration=narration_text,
-                        duration=self._estimate_duration(narration_text, voice=None) if narration_text else None
-                    ))
-                
-                # Start new step
-                current_step = line.replace(f"Step {step_number}:", "").strip()
-                current_explanation = []
-                current_narration = []
-                parsing_mode = None
-                step_number += 1
-                
-            elif line.startswith("EXPLANATION:"):
-                parsing_mode = 'explanation'
-                explanation_content = line.replace("EXPLANATION:", "").strip()
-                if explanation_content:
-                    current_explanation.append(explanation_content)
-                    
-            elif line.startswith("NARRATION:"):
-                parsing_mode = 'narration'
-                narration_content = line.replace("NARRATION:", "").strip()
-                if narration_content:
-                    current_narration.append(narration_content)
-                    
-            elif line and current_step:
-                if parsing_mode == 'explanation':
-                    current_explanation.append(line)
-                elif parsing_mode == 'narration':
-                    current_narration.append(line)
-                else:
-                    # Default to explanation if no mode specified
-                    current_explanation.append(line)
+        return self._parse_steps_cached("lesson", response)
+    
+    async def stream_lesson_steps(
+        self,
+        topic: str,
+        difficulty_level: str = "beginner",
+        user_id: str = "default"
+    ) -> AsyncGenerator[CanvasStep, None]:
+        """Yield ELI5 lesson steps as soon as each one is complete in the streamed response"""
+        tokens: asyncio.Queue = asyncio.Queue()
+        generation = asyncio.create_task(
+            self.generate_eli5_lesson(topic, difficulty_level, user_id, on_token=tokens.put_nowait)
+        )
+        generation.add_done_callback(lambda _: tokens.put_nowait(None))
         
-        # Add the last step
-        if current_step and (current_explanation or current_narration):
-            explanation_text = '\n'.join(current_explanation).strip() if current_explanation else ""
-            narration_text = '\n'.join(current_narration).strip() if current_narration else ""
+        steps: List[CanvasStep] = []
+        text = ""
+        current = None  # Header of the step whose body is still streaming
+        try:
+            while (token := await tokens.get()) is not None:
+                text += token
+                if "\n" in token:
+                    emitted = len(steps)
+                    current = self._collect_streamed_steps(text, current, steps)
+                    for step in steps[emitted:]:
+                        yield step
             
-            steps.append(CanvasStep(
-                step_number=step_number - 1,
-                title=current_step,
-                explanation=explanation_text,
-                content=explanation_text or narration_text,  # Legacy field for backward compatibility
-                narration=narration_text,
-                duration=self._estimate_duration(narration_text) if narration_text else None
-            ))
+            # Surfaces request errors and returns the parsed lesson (used for the fallback step)
+            parsed_steps = await generation
+            if parsed_steps is None and text:
+                # The stream broke off mid-lesson; the open step is incomplete, so it is not flushed
+                raise LessonStreamInterrupted(f"Lesson generation stopped after {len(steps)} complete steps")
+            
+            emitted = len(steps)
+            self._collect_streamed_steps(text, current, steps, final=True)
+            for step in steps[emitted:] if steps else (parsed_steps or []):
+                yield step
+        finally:
+            if not generation.done():
+                generation.cancel()
+    
+    def _collect_streamed_steps(
+        self,
+        text: str,
+        current: Optional[re.Match],
+        steps: List[CanvasStep],
+        final: bool = False
+    ) -> Optional[re.Match]:
+        """Append every step whose body is complete in text and return the header still open"""
+        for match in _STEP_RE.finditer(text, current.end() if current else 0):
+            # A header line is only complete once the newline after it has arrived
+            if match.end() == len(text) and not final:
+                break
+            if current:
+                sections = self._split_step_sections(text[current.end():match.start()])
+                self._flush_step(steps, current.group(2).strip(), sections, with_visuals=False)
+            current = match
+        
+        if final and current:
+            sections = self._split_step_sections(text[current.end():])
+            self._flush_step(steps, current.group(2).strip(), sections, with_visuals=False)
+        
+        return current
+    
+    def _parse_steps_cached(self, kind: str, response: str) -> List[CanvasStep]:
+        """Parse a lesson or visual script response, reusing steps parsed from an identical response"""
+        cache_key = (kind, response)
+        steps = self._steps_cache.get(cache_key)
+        if steps is None:
+            steps = self._parse_lesson_steps(response) if kind == "lesson" else self._parse_visual_script(response)
+            self._steps_cache.set(cache_key, steps)
+        # Callers may update the returned steps, so never hand out the cached instances
+        return [step.model_copy(deep=True) for step in steps]
+    
+    def get_cache_stats(self) -> Dict[str, Dict]:
+        """Get response and parsed-step cache statistics"""
+        return {
+            "responses": self._response_cache.stats(),
+            "parsed_steps": self._steps_cache.stats()
+        }
+    
+    def _parse_lesson_steps(self, response: str) -> List[CanvasStep]:
+        """Parse the Ollama response into CanvasStep objects with explanation and narration"""
+        return self._parse_script_steps(response, with_visuals=False)
+    
+    def _parse_script_steps(self, response: str, with_visuals: bool) -> List[CanvasStep]:
+        """Parse "Step N:" blocks into CanvasSteps in a single pass over the response"""
+        steps = []
+        for match, body in _iter_sections(_STEP_RE, response):
+            if match:
+                self._flush_step(steps, match.group(2).strip(), self._split_step_sections(body), with_visuals)
         
         # If parsing failed, create a fallback single step
         if not steps:
+            fallback = {}
+            if with_visuals:
+                fallback["visual_elements"] = [{"description": "Simple diagram or visual representation"}]
             steps.append(CanvasStep(
                 step_number=1,
                 title="Understanding the Topic",
                 explanation=response,
                 content=response,  # Legacy field for backward compatibility
                 narration=response,
-                duration=self._estimate_duration(response, voice=None)
+                duration=self._estimate_duration(response, voice=None),
+                **fallback
             ))
         
         return steps
     
+    def _flush_step(
+        self,
+        steps: List[CanvasStep],
+        title: str,
+        sections: Dict[str, str],
+        with_visuals: bool
+    ) -> None:
+        """Append the step built from parsed sections, skipping steps without any text"""
+        explanation_text = sections["EXPLANATION"]
+        narration_text = sections["NARRATION"]
+        if not (explanation_text or narration_text):
+            return
+        
+        extra = {}
+        if with_visuals:
+            visual_elements_text = sections["VISUAL_ELEMENTS"]
+            extra["visual_elements"] = [{"description": visual_elements_text}] if visual_elements_text else []
+        
+        steps.append(CanvasStep(
+            step_number=len(steps) + 1,
+            title=title,
+            explanation=explanation_text,
+            content=explanation_text or narration_text,  # Legacy field for backward compatibility
+            narration=narration_text,
+            duration=self._estimate_duration(narration_text) if narration_text else None,
+            **extra
+        ))
+    
+    def _split_step_sections(self, body: str) -> Dict[str, str]:
+        """Slice a step body into its explanation, narration and visual element text"""
+        sections = {"EXPLANATION": [], "NARRATION": [], "VISUAL_ELEMENTS": []}
+        for match, part in _iter_sections(_FIELD_RE, body):
+            # Text before the first label defaults to explanation
+            sections[match.group(1) if match else "EXPLANATION"].append(part)
+        
+        # Strip each slice once; a single-part section joins without copying
+        return {label: "\n".join(filter(None, map(str.strip, parts))) for label, parts in sections.items()}
+    
     def _estimate_duration(self, text: str, voice: str = None) -> float:
         """Estimate the duration of speech for given text in seconds using TTS calibration"""
         if not text:
@@ -230,26 +648,19 @@ Keep each step concise but informative, and make sure the progression is logical
         except Exception as e:
             logger.warning(f"Could not use TTS calibration for duration estimation: {e}")
         
-        # Fallback to improved estimation
-        words = len(text.split())
+        # Fallback to improved estimation, counting words without building a list
+        words = sum(1 for _ in _WORD_RE.finditer(text))
         if words == 0:
             return max(len(text) * 0.05, 1.0)  # 50ms per character, minimum 1 second
         
-        # More conservative baseline (150 WPM instead of 180)
-        words_per_minute = 150
-        duration_minutes = words / words_per_minute
-        duration_seconds = duration_minutes * 60
-        
-        # Add buffer time for pauses, punctuation, and TTS processing
-        buffer_factor = 1.3  # 30% buffer
-        
-        return max(duration_seconds * buffer_factor, 1.0)  # Minimum 1 second
+        return max(words * _SECONDS_PER_WORD, 1.0)  # Minimum 1 second
     
     async def generate_doubt_answer(self, question: str, lesson_topic: str, user_id: str = "default") -> Optional[str]:
         """Generate an answer for a doubt/question about the lesson"""
         
+        # Static instructions first so every doubt shares the same cached prompt prefix
         prompt = f"""
-You are explaining the topic "{lesson_topic}" to a student. They have asked this question: "{question}"
+You are explaining a lesson topic to a student who has asked a question about it. The topic and question are given below.
 
 Please provide a clear, helpful answer that:
 1. Directly addresses their question
@@ -257,6 +668,9 @@ Please provide a clear, helpful answer that:
 3. Uses simple language and examples
 4. Encourages further learning
 
+Topic: "{lesson_topic}"
+Question: "{question}"
+
 Answer:
 """
         
@@ -278,7 +692,7 @@ Answer:
                 
                 # If JSON format was requested, try to parse and return
                 if response_format == "json":
-                    if not content or content.strip() == "":
+                    if not content:
                         logger.warning("Empty response received when JSON format was requested")
                         return {
                             "content": "",
@@ -287,16 +701,15 @@ Answer:
                         }
                     
                     try:
-                        import json
                         # Clean up markdown code blocks if present
                         cleaned_content = self._extract_json_from_markdown(content)
-                        json_data = json.loads(cleaned_content)
+                        json_data = orjson.loads(cleaned_content)
                         return {
                             "content": json_data,
                             "status": "success",
                             "format": "json"
                         }
-                    except json.JSONDecodeError as e:
+                    except orjson.JSONDecodeError as e:
                         # If JSON parsing fails, return as text
                         logger.warning(f"JSON parsing failed: {e}. Content: {content[:100]}...")
                         return {
@@ -327,169 +740,55 @@ Answer:
     async def generate_visual_script(self, topic: str, difficulty_level: str = "beginner", user_id: str = "default") -> Optional[List[CanvasStep]]:
         """Generate a visual lesson script with narration and drawing instructions"""
         
-        difficulty_prompts = {
-            "beginner": "Explain this like I'm 5 years old, using very simple language and visual examples",
-            "intermediate": "Explain this at a middle school level with clear visual demonstrations",
-            "advanced": "Explain this at a high school level with detailed visual explanations"
-        }
-        
-        difficulty_instruction = difficulty_prompts.get(difficulty_level, difficulty_prompts["beginner"])
-        
-        prompt = f"""
-{difficulty_instruction}. Create a visual lesson script for "{topic}" that can be drawn step-by-step on a whiteboard or canvas.
-
-Break this into exactly 5 sequential steps that build upon each other visually. For each step:
-1. Provide a clear, engaging title
-2. Write explanation text for reading
-3. Write narration script that sounds natural when spoken (conversational, engaging)
-4. Describe what visual elements should be drawn (shapes, arrows, text, diagrams)
-
-TTS-AWARE NARRATION GUIDELINES:
-- Target 140-160 words per minute speaking rate
-- Write for natural speech: use contractions, shorter sentences
-- Each narration should be 20-40 words for 15-30 second duration
-- Avoid complex punctuation that doesn't translate to speech
-- Include natural pauses and emphasis points
-- Consider pronunciation of technical terms
-
-Think about visual concepts like:
-- Simple shapes (rectangles, circles, arrows)
-- Flow diagrams and connections
-- Labels and annotations
-- Progressive building of concepts
-- Clear visual metaphors and analogies
-
-Format your response as follows:
-Step 1: [Title]
-EXPLANATION: [Detailed explanation for reading]
-NARRATION: [Script for voice-over - natural, conversational tone, 20-40 words]
-VISUAL_ELEMENTS: [Describe what to draw: shapes, text, arrows, positioning]
-
-Step 2: [Title]
-EXPLANATION: [Detailed explanation for reading]
-NARRATION: [Script for voice-over - natural, conversational tone, 20-40 words]
-VISUAL_ELEMENTS: [Describe what to draw: shapes, text, arrows, positioning]
-
-[Continue for all 5 steps...]
-
-Focus on topics that can be effectively visualized through simple drawings. Make the narration engaging and the visual descriptions clear enough that someone could recreate the drawings.
-"""
+        prompt = _build_lesson_prompt("visual", topic, difficulty_level)
         
         response = await self._make_request(prompt, user_id)
         
         if not response:
             return None
             
-        return self._parse_visual_script(response)
+        return self._parse_steps_cached("visual", response)
     
     def _parse_visual_script(self, response: str) -> List[CanvasStep]:
         """Parse the visual script response into CanvasStep objects"""
-        steps = []
-        lines = response.strip().split('\n')
-        
-        current_step = None
-        current_explanation = []
-        current_narration = []
-        current_visual_elements = []
-        step_number = 1
-        parsing_mode = None
-        
-        for line in lines:
-            line = line.strip()
-            
-            if line.startswith(f"Step {step_number}:"):
-                # Save previous step if exists
-                if current_step and (current_explanation or current_narration):
-                    explanation_text = '\n'.join(current_explanation).strip() if current_explanation else ""
-                    narration_text = '\n'.join(current_narration).strip() if current_narration else ""
-                    visual_elements_text = '\n'.join(current_visual_elements).strip() if current_visual_elements else ""
-                    
-                    steps.append(CanvasStep(
-                        step_number=step_number - 1,
-                        title=current_step,
-                        explanation=explanation_text,
-                        content=explanation_text or narration_text,  # Legacy field for backward compatibility
-                        narration=narration_text,
-                        visual_elements=[{"description": visual_elements_text}] if visual_elements_text else [],
-                        duration=self._estimate_duration(narration_text, voice=None) if narration_text else None
-                    ))
-                
-                # Start new step
-                current_step = line.replace(f"Step {step_number}:", "").strip()
-                current_explanation = []
-                current_narration = []
-                current_visual_elements = []
-                parsing_mode = None
-                step_number += 1
-                
-            elif line.startswith("EXPLANATION:"):
-                parsing_mode = 'explanation'
-                explanation_content = line.replace("EXPLANATION:", "").strip()
-                if explanation_content:
-                    current_explanation.append(explanation_content)
-                    
-            elif line.startswith("NARRATION:"):
-                parsing_mode = 'narration'
-                narration_content = line.replace("NARRATION:", "").strip()
-                if narration_content:
-                    current_narration.append(narration_content)
-                    
-            elif line.startswith("VISUAL_ELEMENTS:"):
-                parsing_mode = 'visual_elements'
-                visual_content = line.replace("VISUAL_ELEMENTS:", "").strip()
-                if visual_content:
-                    current_visual_elements.append(visual_content)
-                    
-            elif line and current_step:
-                if parsing_mode == 'explanation':
-                    current_explanation.append(line)
-                elif parsing_mode == 'narration':
-                    current_narration.append(line)
-                elif parsing_mode == 'visual_elements':
-                    current_visual_elements.append(line)
-                else:
-                    # Default to explanation if no mode specified
-                    current_explanation.append(line)
-        
-        # Add the last step
-        if current_step and (current_explanation or current_narration):
-            explanation_text = '\n'.join(current_explanation).strip() if current_explanation else ""
-            narration_text = '\n'.join(current_narration).strip() if current_narration else ""
-            visual_elements_text = '\n'.join(current_visual_elements).strip() if current_visual_elements else ""
-            
-            steps.append(CanvasStep(
-                step_number=step_number - 1,
-                title=current_step,
-                explanation=explanation_text,
-                content=explanation_text or narration_text,  # Legacy field for backward compatibility
-                narration=narration_text,
-                visual_elements=[{"description": visual_elements_text}] if visual_elements_text else [],
-                duration=self._estimate_duration(narration_text) if narration_text else None
-            ))
-        
-        # If parsing failed, create a fallback single step
-        if not steps:
-            steps.append(CanvasStep(
-                step_number=1,
-                title="Understanding the Topic",
-                explanation=response,
-                content=response,  # Legacy field for backward compatibility
-                narration=response,
-                visual_elements=[{"description": "Simple diagram or visual representation"}],
-                duration=self._estimate_duration(response, voice=None)
-            ))
-        
-        return steps
+        return self._parse_script_steps(response, with_visuals=True)
     
     async def health_check(self) -> bool:
         """Check if Ollama service is available"""
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(f"{self.base_url}/api/tags")
-                return response.status_code == 200
+            response = await self._get_client().get("/api/tags", timeout=5.0)
+            return response.status_code == 200
         except:
             return False
     
+    async def warmup(self) -> None:
+        """Open pooled connections to Ollama ahead of the first request (called on application startup)"""
+        try:
+            response = await self._get_client().get("/api/tags", timeout=3.0)
+            if self.http_backend == "aiohttp":
+                # Generation goes through the aiohttp pool, so warm a connection there too
+                async with self._get_aiohttp_session().get(f"{self.base_url}/api/tags") as aiohttp_response:
+                    await aiohttp_response.read()
+            logger.info(f"Ollama connection warmed up (HTTP {response.status_code})")
+        except Exception as e:
+            logger.warning(f"Ollama warmup skipped, server not reachable: {e!r}")
+    
+    async def aclose(self) -> None:
+        """Close the pooled HTTP clients (called on application shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._aiohttp_session is not None:
+            await self._aiohttp_session.close()
+            self._aiohttp_session = None
+    
+    async def __aenter__(self) -> "OllamaService":
+        self._get_client()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+    
     async def test_llm_capability(self, model: str, prompt: str, streaming: bool = False, 
                                   temperature: float = 0.7, max_tokens: int = 150) -> Dict:
         """Test LLM capabilities including streaming support and feature detection"""
@@ -498,40 +797,40 @@ Focus on topics that can be effectively visualized through simple drawings. Make
         start_time = time.time()
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                request_data = {
-                    "model": model,
-                    "prompt": prompt,
-                    "stream": streaming,
-                    "options": {
-                        "temperature": temperature,
-                        "num_predict": max_tokens,
-                    }
-                }
-                
-                if streaming:
-                    response = await self._test_streaming_response(client, request_data)
-                else:
-                    response = await self._test_non_streaming_response(client, request_data)
-                
-                end_time = time.time()
-                response_time = end_time - start_time
-                
-                # Get base features and update with actual streaming test result
-                features = await self._detect_model_features(model)
-                features["streaming"] = response.get("streaming_supported", streaming)
-                
-                return {
-                    "success": True,
-                    "response": response.get("response", ""),
-                    "responseTime": response_time,
-                    "tokenCount": response.get("token_count"),
-                    "streaming": streaming,
-                    "streamingMetrics": response.get("streaming_metrics"),
-                    "streamingSupported": response.get("streaming_supported", streaming),
-                    "features": features
+            client = self._get_client()
+            request_data = {
+                "model": model,
+                "prompt": prompt,
+                "stream": streaming,
+                "options": {
+                    "temperature": temperature,
+                    "num_predict": max_tokens,
                 }
-                
+            }
+            
+            if streaming:
+                response = await self._test_streaming_response(client, request_data)
+            else:
+                response = await self._test_non_streaming_response(client, request_data)
+            
+            end_time = time.time()
+            response_time = end_time - start_time
+            
+            # Get base features and update with actual streaming test result
+            features = await self._detect_model_features(model)
+            features["streaming"] = response.get("streaming_supported", streaming)
+            
+            return {
+                "success": True,
+                "response": response.get("response", ""),
+                "responseTime": response_time,
+                "tokenCount": response.get("token_count"),
+                "streaming": streaming,
+                "streamingMetrics": response.get("streaming_metrics"),
+                "streamingSupported": response.get("streaming_supported", streaming),
+                "features": features
+            }
+            
         except Exception as e:
             end_time = time.time()
             response_time = end_time - start_time
@@ -551,8 +850,9 @@ Focus on topics that can be effectively visualized through simple drawings. Make
         try:
             start_time = time.time()
             response = await client.post(
-                f"{self.base_url}/api/generate",
-                json=request_data
+                "/api/generate",
+                json=request_data,
+                timeout=30.0
             )
             
             if response.status_code == 200:
@@ -571,8 +871,7 @@ Focus on topics that can be effectively visualized through simple drawings. Make
                             chunk_time = time.time()
                             
                             try:
-                                import json
-                                chunk = json.loads(line)
+                                chunk = orjson.loads(line)
                                 
                                 if "response" in chunk and chunk["response"]:
                                     chunk_content = chunk["response"]
@@ -598,7 +897,7 @@ Focus on topics that can be effectively visualized through simple drawings. Make
                                 if chunk.get("done", False):
                                     break
                                     
-                            except json.JSONDecodeError:
+                            except orjson.JSONDecodeError:
                                 continue
                     
                     # Calculate streaming quality metrics
@@ -631,7 +930,7 @@ Focus on topics that can be effectively visualized through simple drawings. Make
                         }
                     }
                 else:
-                    result = response.json()
+                    result = orjson.loads(response.content)
                     return {
                         "response": result.get("response", ""),
                         "streaming_supported": False
@@ -649,7 +948,7 @@ Focus on topics that can be effectively visualized through simple drawings. Make
                 )
                 
                 if fallback_response.status_code == 200:
-                    result = fallback_response.json()
+                    result = orjson.loads(fallback_response.content)
                     return {
                         "response": result.get("response", ""),
                         "streaming_supported": False,
@@ -738,12 +1037,13 @@ Focus on topics that can be effectively visualized through simple drawings. Make
     async def _test_non_streaming_response(self, client: httpx.AsyncClient, request_data: Dict) -> Dict:
         """Test non-streaming response functionality"""
         response = await client.post(
-            f"{self.base_url}/api/generate",
-            json=request_data
+            "/api/generate",
+            json=request_data,
+            timeout=30.0
         )
         
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             return {
                 "response": result.get("response", ""),
                 "token_count": result.get("eval_count"),
@@ -755,41 +1055,42 @@ Focus on topics that can be effectively visualized through simple drawings. Make
     async def _detect_model_features(self, model: str) -> Dict:
         """Detect model capabilities and features"""
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                # Get model info
-                response = await client.post(
-                    f"{self.base_url}/api/show",
-                    json={"name": model}
-                )
+            client = self._get_client()
+            # Get model info
+            response = await client.post(
+                "/api/show",
+                json={"name": model},
+                timeout=10.0
+            )
+            
+            if response.status_code == 200:
+                model_info = orjson.loads(response.content)
+                logger.info(f"Model info for {model}: {model_info}")
+                
+                # Extract features from model info with fallbacks
+                context_length = await self._extract_context_length(model_info, model)
+                max_tokens = self._infer_max_tokens_from_model(model, context_length)
+                
+                features = {
+                    "streaming": None,  # Will be determined by actual testing
+                    "contextLength": context_length,
+                    "multimodal": False,  # Remove unreliable detection
+                    "functionCalling": False,  # Most local models don't support this
+                    "visionSupport": False,  # Remove unreliable detection
+                    "codeGeneration": False,  # Remove unreliable detection
+                    "maxTokens": max_tokens,
+                    "temperature": True,
+                    "topP": True,
+                    "frequencyPenalty": False,  # Ollama doesn't support these
+                    "presencePenalty": False
+                }
+                
+                logger.info(f"Detected features for {model}: {features}")
+                return features
+            else:
+                # Return default features if model info can't be retrieved
+                return self._get_default_features()
                 
-                if response.status_code == 200:
-                    model_info = response.json()
-                    logger.info(f"Model info for {model}: {model_info}")
-                    
-                    # Extract features from model info with fallbacks
-                    context_length = await self._extract_context_length(model_info, model)
-                    max_tokens = self._infer_max_tokens_from_model(model, context_length)
-                    
-                    features = {
-                        "streaming": None,  # Will be determined by actual testing
-                        "contextLength": context_length,
-                        "multimodal": False,  # Remove unreliable detection
-                        "functionCalling": False,  # Most local models don't support this
-                        "visionSupport": False,  # Remove unreliable detection
-                        "codeGeneration": False,  # Remove unreliable detection
-                        "maxTokens": max_tokens,
-                        "temperature": True,
-                        "topP": True,
-                        "frequencyPenalty": False,  # Ollama doesn't support these
-                        "presencePenalty": False
-                    }
-                    
-                    logger.info(f"Detected features for {model}: {features}")
-                    return features
-                else:
-                    # Return default features if model info can't be retrieved
-                    return self._get_default_features()
-                    
         except Exception:
             return self._get_default_features()
     
@@ -961,36 +1262,7 @@ Focus on topics that can be effectively visualized through simple drawings. Make
     
     def _extract_json_from_markdown(self, content: str) -> str:
         """Extract JSON content from markdown code blocks"""
-        import re
-        
-        # Remove leading/trailing whitespace
-        content = content.strip()
-        
-        # Pattern to match markdown code blocks with optional language identifier
-        # Matches: ```json\n{...}\n``` or ```\n{...}\n```
-        markdown_pattern = r'```(?:json)?\s*\n?(.*?)\n?```'
-        
-        # Try to find JSON in markdown code blocks
-        matches = re.findall(markdown_pattern, content, re.DOTALL | re.IGNORECASE)
-        if matches:
-            # Use the first match (largest code block)
-            json_content = matches[0].strip()
-            logger.debug(f"Extracted JSON from markdown: {json_content[:100]}...")
-            return json_content
-        
-        # If no markdown blocks found, try to extract JSON-like content
-        # Look for content between first { and last }
-        start_idx = content.find('{')
-        end_idx = content.rfind('}')
-        
-        if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-            json_content = content[start_idx:end_idx + 1]
-            logger.debug(f"Extracted JSON from braces: {json_content[:100]}...")
-            return json_content
-        
-        # Return original content if no extraction possible
-        logger.debug("No JSON extraction possible, returning original content")
-        return content
+        return extract_json_from_markdown(content)
     
     def _get_default_features(self) -> Dict:
         """Get default feature set for unknown models"""
@@ -1008,35 +1280,54 @@ Focus on topics that can be effectively visualized through simple drawings. Make
             "presencePenalty": False
         }
     
+    async def embed(self, text: str, model: Optional[str] = None) -> Optional[List[float]]:
+        """Get an embedding vector for text from Ollama's embeddings endpoint"""
+        try:
+            async with self._request_slots:
+                response = await self._get_client().post(
+                    "/api/embeddings",
+                    json={
+                        "model": model or settings.ollama_embedding_model,
+                        "prompt": text,
+                        "keep_alive": settings.ollama_keep_alive
+                    },
+                    timeout=self.per_attempt_timeout
+                )
+            if response.status_code != 200:
+                logger.warning(f"Ollama embeddings error: {response.status_code} - {response.text}")
+                return None
+            return orjson.loads(response.content).get("embedding") or None
+        except Exception as e:
+            logger.warning(f"Ollama embedding request failed: {e}")
+            return None
+    
     async def get_available_models(self) -> List[str]:
         """Get list of available models from Ollama"""
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(f"{self.base_url}/api/tags")
-                if response.status_code == 200:
-                    data = response.json()
-                    models = []
-                    for model in data.get("models", []):
-                        models.append(model.get("name", ""))
-                    return models
-                else:
-                    return []
+            response = await self._get_client().get("/api/tags", timeout=5.0)
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                models = []
+                for model in data.get("models", []):
+                    models.append(model.get("name", ""))
+                return models
+            else:
+                return []
         except Exception:
             return []
 
     async def get_model_details_from_tags(self, model_name: str) -> Dict:
         """Get detailed model information from Ollama tags API"""
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(f"{self.base_url}/api/tags")
-                if response.status_code == 200:
-                    data = response.json()
-                    for model in data.get("models", []):
-                        if model.get("name") == model_name:
-                            return model
-                    return {}
-                else:
-                    return {}
+            response = await self._get_client().get("/api/tags", timeout=5.0)
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                for model in data.get("models", []):
+                    if model.get("name") == model_name:
+                        return model
+                return {}
+            else:
+                return {}
         except Exception:
             return {}
     
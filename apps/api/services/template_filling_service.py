@@ -1,14 +1,108 @@
 """
 Template Filling Service for LLM-powered content generation
 """
+import asyncio
 import json
 import re
+from functools import lru_cache
+from itertools import islice
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 import logging
+from utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Obvious unfilled-placeholder markers, matched against lowercased content. Punctuation markers
+# are plain substrings; word markers must be whole words, so "stdout" or "mastodon" still pass.
+_PLACEHOLDER_MARKERS = ("{{", "}}", "[replace")
+_PLACEHOLDER_WORD_RE = re.compile(r"\b(?:placeholders?|todo|tbd|insert here|add here|fill in)\b")
+
+# Common signs of content contamination from different topics
+_OFF_TOPIC_WORDS = frozenset({
+    "dna", "genetic", "genetics", "biology", "chromosome", "chromosomes",  # Biology terms when not relevant
+    "cooking", "recipe", "recipes", "ingredient", "ingredients",  # Cooking terms when not relevant
+    "weather", "climate", "temperature", "temperatures",  # Weather terms when not relevant
+    "sports", "football", "basketball",  # Sports terms when not relevant
+})
+
+_WORD_RE = re.compile(r"[a-z]+")
+
+# Batched placeholder generation: one prompt lists every slot, the model answers each under
+# a "===SLOT:name===" marker line
+_BATCH_SLOTS_PROMPT = (
+    "Write content for every slot listed below about the topic given at the end. "
+    "Follow each slot's instructions and stay within its character and line limits. "
+    "Respond with plain text only, without markdown. Begin each slot's content with its "
+    "marker line exactly as shown (for example ===SLOT:heading===) and output nothing else.\n\n"
+)
+_SLOT_MARKER_RE = re.compile(r"^[ \t]*===SLOT:([\w-]+)===[ \t]*$", re.MULTILINE)
+
+_PROMPT_FIELD_RE = re.compile(r"\{\{TOPIC\}\}|\{maxChars\}|\{maxLines\}")
+
+
+@lru_cache(maxsize=512)
+def _specialize_prompt(prompt_template: str, max_chars: int, max_lines: int, format_type: str) -> str:
+    """Render a prompt template for one set of constraints in a single substitution pass"""
+    # The topic itself is appended last by _call_llm so the instructions form a stable prefix
+    values = {
+        "{{TOPIC}}": "the topic given below",
+        "{maxChars}": str(max_chars),
+        "{maxLines}": str(max_lines)
+    }
+    prompt = _PROMPT_FIELD_RE.sub(lambda match: values[match.group(0)], prompt_template)
+    
+    # Add additional formatting instructions based on format
+    if format_type == "bullets":
+        prompt += " Use bullet points with • symbols."
+    
+    return prompt
+
+
+# Default character and line limits per field type for structured prompts
+_DEFAULT_MAX_CHARS = {
+    "heading": 60,
+    "title": 60,
+    "content": 280,
+    "body": 280,
+    "text": 280,
+    "description": 200,
+    "summary": 150,
+    "objective": 120
+}
+
+_DEFAULT_MAX_LINES = {
+    "heading": 1,
+    "title": 1,
+    "content": 5,
+    "body": 5,
+    "text": 4,
+    "description": 3,
+    "summary": 3,
+    "objective": 2
+}
+
+# Difficulty-specific wording appended to field prompts
+_DIFFICULTY_INSTRUCTIONS = {
+    "beginner": " Use simple language and avoid jargon. Be clear and concise.",
+    "intermediate": " Use clear explanations with appropriate technical terms.",
+    "advanced": " Provide detailed explanations with precise terminology."
+}
+
+# Topic adherence and plain-text rules shared by every field prompt
+_PROMPT_RULES_SUFFIX = (
+    # Strict topic adherence prevents off-topic content
+    " IMPORTANT: Stay strictly on the given topic. Do not include unrelated examples, analogies, or information from other subjects."
+    # Strong formatting instruction prevents markdown
+    " CRITICAL: Respond with plain text only. Do not use markdown formatting, asterisks (*), underscores (_), hash symbols (#), or any special formatting symbols. Do not include character counts or word counts in your response."
+)
+
+
+# Per-slide constraints for each breakpoint. Entries keep a reference to their slide so the
+# id() in the key cannot be reused by another dict while cached
+_constraints_cache = TTLCache(maxsize=512, ttl=3600)
+
+
 @dataclass
 class FilledTemplate:
     """Represents a template filled with LLM-generated content"""
@@ -24,6 +118,8 @@ class TemplateFiller:
     
     def __init__(self, ollama_service=None):
         self.ollama_service = ollama_service
+        # Generate all placeholders of a slide with one LLM call when there are several
+        self.batch_placeholders = True
         
     async def fill_template(
         self, 
@@ -143,30 +239,37 @@ class TemplateFiller:
         slide: Dict, 
         container_size: Optional[Dict]
     ) -> Dict[str, Any]:
-        """Get responsive constraints based on container size"""
+        """Get responsive constraints based on container size (shared, do not modify)"""
         
         if not container_size:
             # Use desktop defaults
-            return self._extract_constraints(slide["layout"])
-        
-        # Determine breakpoint
-        width = container_size.get("width", 800)
-        if width < 768:
-            breakpoint = "mobile"
-        elif width < 1024:
-            breakpoint = "tablet"
+            breakpoint = None
         else:
-            breakpoint = "desktop"
-        
-        # Merge base layout with responsive overrides
-        layout = slide["layout"].copy()
-        responsive_overrides = slide.get("responsive", {}).get(breakpoint, {})
-        
-        for element_type, overrides in responsive_overrides.items():
-            if element_type in layout:
-                layout[element_type].update(overrides)
-        
-        return self._extract_constraints(layout)
+            # Determine breakpoint
+            width = container_size.get("width", 800)
+            if width < 768:
+                breakpoint = "mobile"
+            elif width < 1024:
+                breakpoint = "tablet"
+            else:
+                breakpoint = "desktop"
+        
+        cache_key = (id(slide), breakpoint)
+        cached = _constraints_cache.get(cache_key)
+        if cached is not None and cached[0] is slide:
+            return cached[1]
+        
+        # Merge base layout with responsive overrides without touching the template's layout
+        layout = dict(slide["layout"])
+        if breakpoint:
+            responsive_overrides = slide.get("responsive", {}).get(breakpoint, {})
+            for element_type, overrides in responsive_overrides.items():
+                if element_type in layout:
+                    layout[element_type] = {**layout[element_type], **overrides}
+        
+        constraints = self._extract_constraints(layout)
+        _constraints_cache.set(cache_key, (slide, constraints))
+        return constraints
     
     def _extract_constraints(self, layout: Dict) -> Dict[str, Any]:
         """Extract character and line constraints from layout"""
@@ -191,40 +294,109 @@ class TemplateFiller:
         
         placeholders = slide.get("placeholders", {})
         llm_prompts = slide.get("llmPrompts", {})
+        fallback_data = slide.get("fallbackData", {})
         filled_content = {}
+        pending = []
         
-        for placeholder_key, placeholder_value in placeholders.items():
+        for placeholder_key in placeholders:
             if placeholder_key in llm_prompts:
-                # Get the prompt template
-                prompt_template = llm_prompts[placeholder_key]
-                
                 # Get constraints for this element
                 element_constraints = constraints.get(placeholder_key, {})
                 
                 # Build the actual prompt
                 prompt = self._build_prompt(
-                    prompt_template, 
+                    llm_prompts[placeholder_key], 
                     topic, 
                     element_constraints
                 )
-                
-                # Generate content with LLM
-                raw_content = await self._call_llm(prompt, element_constraints)
-                
-                # Sanitize the LLM output immediately to remove markdown formatting
-                generated_content = self._sanitize_llm_output(raw_content)
-                filled_content[placeholder_key] = generated_content
-                
-                logger.debug(f"Generated content for {placeholder_key}: {generated_content[:100]}...")
+                pending.append((placeholder_key, prompt, element_constraints))
             else:
                 # No prompt defined, use fallback
-                fallback_data = slide.get("fallbackData", {})
                 filled_content[placeholder_key] = fallback_data.get(
                     placeholder_key, 
                     f"[No content generated for {placeholder_key}]"
                 )
         
-        return filled_content
+        batched = None
+        if self.batch_placeholders and len(pending) > 1:
+            batched = await self._generate_content_batched(pending, topic)
+        
+        if batched is not None:
+            results = [batched[placeholder_key] for placeholder_key, _, _ in pending]
+        else:
+            # Generate every placeholder concurrently; OllamaService bounds in-flight requests
+            results = await asyncio.gather(
+                *(self._call_llm(prompt, element_constraints, topic)
+                  for _, prompt, element_constraints in pending),
+                return_exceptions=True
+            )
+        
+        failures = [result for result in results if isinstance(result, Exception)]
+        if pending and len(failures) == len(pending):
+            # Nothing was generated - let the caller fall back to the whole template
+            raise failures[0]
+        
+        for (placeholder_key, _, _), result in zip(pending, results):
+            if isinstance(result, Exception):
+                logger.warning(f"LLM generation failed for {placeholder_key}, using fallback data: {result}")
+                filled_content[placeholder_key] = fallback_data.get(
+                    placeholder_key, 
+                    f"[No content generated for {placeholder_key}]"
+                )
+                continue
+            
+            # Sanitize the LLM output immediately to remove markdown formatting
+            generated_content = self._sanitize_llm_output(result)
+            filled_content[placeholder_key] = generated_content
+            
+            logger.debug(f"Generated content for {placeholder_key}: {generated_content[:100]}...")
+        
+        # Keep the template's placeholder order
+        return {key: filled_content[key] for key in placeholders}
+    
+    async def _generate_content_batched(
+        self,
+        pending: List[tuple],
+        topic: str
+    ) -> Optional[Dict[str, str]]:
+        """Generate several placeholders with one LLM call; None if the response is unusable"""
+        if not self.ollama_service:
+            return None
+        
+        slot_sections = []
+        for placeholder_key, prompt, element_constraints in pending:
+            limits = (
+                f"maxChars={element_constraints.get('maxChars', 300)} "
+                f"maxLines={element_constraints.get('maxLines', 5)}"
+            )
+            if element_constraints.get("format") == "bullets":
+                limits += " format=bullets"
+            slot_sections.append(f"===SLOT:{placeholder_key}=== ({limits})\n{prompt}")
+        
+        batch_prompt = _BATCH_SLOTS_PROMPT + "\n\n".join(slot_sections) + f"\n\nTopic: {topic}"
+        
+        try:
+            response_text = await self.ollama_service._make_request(batch_prompt, "system")
+        except Exception as e:
+            logger.warning(f"Batched placeholder generation failed: {e}")
+            return None
+        
+        if not response_text:
+            return None
+        
+        # re.split with one capture group yields [preamble, name1, body1, name2, body2, ...]
+        parts = _SLOT_MARKER_RE.split(response_text)
+        slots = {name: body.strip() for name, body in zip(parts[1::2], parts[2::2])}
+        
+        generated = {}
+        for placeholder_key, _, element_constraints in pending:
+            content = slots.get(placeholder_key)
+            if not content:
+                logger.info(f"Batched response missing slot '{placeholder_key}', generating placeholders individually")
+                return None
+            generated[placeholder_key] = self._validate_and_trim_content(content, element_constraints)
+        
+        return generated
     
     async def _generate_content_from_structured_prompts(
         self,
@@ -243,65 +415,54 @@ class TemplateFiller:
         Returns:
             Dict with field names as keys and generated content as values
         """
-        filled_content = {}
-        
-        for field_name, prompt in content_prompts.items():
-            try:
-                # Get constraints for this specific field
-                field_constraints = constraints.get(field_name, {
-                    "maxChars": self._get_default_max_chars(field_name),
-                    "maxLines": self._get_default_max_lines(field_name),
-                    "format": "text"
-                })
-                
-                # Enhance prompt with difficulty and constraints
-                enhanced_prompt = self._enhance_prompt_with_constraints(
-                    prompt, field_constraints, difficulty_level
-                )
-                
-                # Generate content with LLM
-                generated_content = await self._call_llm_with_retry(
-                    enhanced_prompt, field_constraints, field_name
-                )
-                
-                filled_content[field_name] = generated_content
-                logger.debug(f"Generated {field_name}: {generated_content[:50]}...")
-                
-            except Exception as e:
-                logger.error(f"Failed to generate content for {field_name}: {e}")
-                
-                # Use fallback content
-                filled_content[field_name] = self._get_fallback_content(field_name)
-        
-        return filled_content
+        results = await asyncio.gather(*(
+            self._generate_structured_field(field_name, prompt, constraints, difficulty_level)
+            for field_name, prompt in content_prompts.items()
+        ))
+        return dict(zip(content_prompts.keys(), results))
+    
+    async def _generate_structured_field(
+        self,
+        field_name: str,
+        prompt: str,
+        constraints: Dict[str, Any],
+        difficulty_level: str
+    ) -> str:
+        """Generate one structured-prompt field, falling back on failure"""
+        try:
+            # Get constraints for this specific field
+            field_constraints = constraints.get(field_name, {
+                "maxChars": self._get_default_max_chars(field_name),
+                "maxLines": self._get_default_max_lines(field_name),
+                "format": "text"
+            })
+            
+            # Enhance prompt with difficulty and constraints
+            enhanced_prompt = self._enhance_prompt_with_constraints(
+                prompt, field_constraints, difficulty_level
+            )
+            
+            # Generate content with LLM
+            generated_content = await self._call_llm_with_retry(
+                enhanced_prompt, field_constraints, field_name
+            )
+            
+            logger.debug(f"Generated {field_name}: {generated_content[:50]}...")
+            return generated_content
+            
+        except Exception as e:
+            logger.error(f"Failed to generate content for {field_name}: {e}")
+            
+            # Use fallback content
+            return self._get_fallback_content(field_name)
     
     def _get_default_max_chars(self, field_name: str) -> int:
         """Get default character limits based on field type"""
-        char_limits = {
-            "heading": 60,
-            "title": 60,
-            "content": 280,
-            "body": 280,
-            "text": 280,
-            "description": 200,
-            "summary": 150,
-            "objective": 120
-        }
-        return char_limits.get(field_name, 200)
+        return _DEFAULT_MAX_CHARS.get(field_name, 200)
     
     def _get_default_max_lines(self, field_name: str) -> int:
         """Get default line limits based on field type"""
-        line_limits = {
-            "heading": 1,
-            "title": 1,
-            "content": 5,
-            "body": 5,
-            "text": 4,
-            "description": 3,
-            "summary": 3,
-            "objective": 2
-        }
-        return line_limits.get(field_name, 3)
+        return _DEFAULT_MAX_LINES.get(field_name, 3)
     
     def _enhance_prompt_with_constraints(
         self,
@@ -324,20 +485,9 @@ class TemplateFiller:
         else:
             enhanced_prompt += f" Use maximum {max_lines} lines."
         
-        # Add difficulty-specific instructions
-        difficulty_instructions = {
-            "beginner": " Use simple language and avoid jargon. Be clear and concise.",
-            "intermediate": " Use clear explanations with appropriate technical terms.",
-            "advanced": " Provide detailed explanations with precise terminology."
-        }
-        
-        enhanced_prompt += difficulty_instructions.get(difficulty_level, "")
-        
-        # Add strict topic adherence instruction to prevent off-topic content
-        enhanced_prompt += " IMPORTANT: Stay strictly on the given topic. Do not include unrelated examples, analogies, or information from other subjects."
-        
-        # Add strong formatting instruction to prevent markdown
-        enhanced_prompt += " CRITICAL: Respond with plain text only. Do not use markdown formatting, asterisks (*), underscores (_), hash symbols (#), or any special formatting symbols. Do not include character counts or word counts in your response."
+        # Add difficulty-specific instructions, then the fixed topic and formatting rules
+        enhanced_prompt += _DIFFICULTY_INSTRUCTIONS.get(difficulty_level, "")
+        enhanced_prompt += _PROMPT_RULES_SUFFIX
         
         # Add format instructions
         format_type = constraints.get("format", "text")
@@ -451,27 +601,13 @@ class TemplateFiller:
             return False
         
         # More relaxed placeholder check - only reject obvious placeholders
-        obvious_placeholders = [
-            "{{", "}}", "placeholder", "TODO", "TBD",
-            "insert here", "add here", "fill in", "[REPLACE"
-        ]
-        
         content_lower = content.lower()
-        for indicator in obvious_placeholders:
-            if indicator in content_lower:
-                return False
-        
-        # Check for obvious off-topic content indicators
-        # These are common signs of content contamination from different topics
-        off_topic_indicators = [
-            "dna", "genetic", "biology", "chromosome",  # Biology terms when not relevant
-            "cooking", "recipe", "ingredient",  # Cooking terms when not relevant
-            "weather", "climate", "temperature",  # Weather terms when not relevant
-            "sports", "football", "basketball",  # Sports terms when not relevant
-        ]
+        if any(marker in content_lower for marker in _PLACEHOLDER_MARKERS) or _PLACEHOLDER_WORD_RE.search(content_lower):
+            return False
         
+        # Check for obvious off-topic content indicators with one tokenize + set intersection
         # Only flag as off-topic if multiple indicators are present (avoids false positives)
-        off_topic_count = sum(1 for indicator in off_topic_indicators if indicator in content_lower)
+        off_topic_count = len(_OFF_TOPIC_WORDS.intersection(_WORD_RE.findall(content_lower)))
         if off_topic_count >= 2:
             logger.warning(f"Content appears off-topic for {field_name}: {content[:100]}...")
             return False
@@ -519,23 +655,15 @@ class TemplateFiller:
         topic: str, 
         constraints: Dict
     ) -> str:
-        """Build the actual LLM prompt from template and constraints"""
-        
-        # Replace topic placeholder
-        prompt = prompt_template.replace("{{TOPIC}}", topic)
-        
-        # Replace constraint placeholders
-        prompt = prompt.replace("{maxChars}", str(constraints.get("maxChars", 300)))
-        prompt = prompt.replace("{maxLines}", str(constraints.get("maxLines", 5)))
-        
-        # Add additional formatting instructions based on format
-        format_type = constraints.get("format", "text")
-        if format_type == "bullets":
-            prompt += " Use bullet points with • symbols."
-        
-        return prompt
+        """Build the topic-independent LLM instructions from template and constraints"""
+        return _specialize_prompt(
+            prompt_template,
+            constraints.get("maxChars", 300),
+            constraints.get("maxLines", 5),
+            constraints.get("format", "text")
+        )
     
-    async def _call_llm(self, prompt: str, constraints: Dict) -> str:
+    async def _call_llm(self, prompt: str, constraints: Dict, topic: Optional[str] = None) -> str:
         """Call the LLM service to generate content"""
         
         if not self.ollama_service:
@@ -545,6 +673,8 @@ class TemplateFiller:
             # Add constraints to the prompt to guide generation
             max_chars = constraints.get("maxChars", 300)
             enhanced_prompt = f"{prompt} Keep your response under {max_chars} characters and make it clear and direct."
+            if topic:
+                enhanced_prompt += f"\n\nTopic: {topic}"
             
             # Call Ollama service using the correct method
             response_text = await self.ollama_service._make_request(enhanced_prompt, "system")
@@ -573,36 +703,33 @@ class TemplateFiller:
         
         # Handle bullet point formatting
         if format_type == "bullets":
-            lines = content.split('\n')
-            bullet_lines = []
-            
-            for line in lines[:max_lines]:  # Limit number of bullets
-                line = line.strip()
-                if line:
-                    # Ensure bullet format
-                    if not line.startswith('•') and not line.startswith('-'):
-                        line = f"• {line}"
-                    bullet_lines.append(line)
-            
-            content = '\n'.join(bullet_lines)
+            stripped_lines = (line.strip() for line in islice(content.split('\n'), max_lines))
+            content = '\n'.join(
+                line if line.startswith(('•', '-')) else f"• {line}"  # Ensure bullet format
+                for line in stripped_lines if line
+            )
+            cut = len(content)
         else:
-            # Handle regular text formatting
-            lines = content.split('\n')
-            if len(lines) > max_lines:
-                content = '\n'.join(lines[:max_lines])
+            # Cut at the max_lines-th newline without splitting the text into lines
+            cut = len(content)
+            newline = -1
+            for _ in range(max_lines):
+                newline = content.find('\n', newline + 1)
+                if newline == -1:
+                    break
+            else:
+                cut = max(newline, 0)
         
         # Trim to character limit while preserving word boundaries
-        if len(content) > max_chars:
+        if cut > max_chars:
             # Find last space before the limit
-            trimmed = content[:max_chars]
-            last_space = trimmed.rfind(' ')
+            last_space = content.rfind(' ', 0, max_chars)
             
             if last_space > max_chars * 0.7:  # If space is reasonably close
-                content = trimmed[:last_space] + "..."
-            else:
-                content = trimmed + "..."
+                return content[:last_space] + "..."
+            return content[:max_chars] + "..."
         
-        return content
+        return content[:cut] if cut < len(content) else content
     
     def _create_fallback_template(
         self, 
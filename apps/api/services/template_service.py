@@ -10,6 +10,39 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Keyword tables for template scoring, matched against template names and descriptions
+_DIFFICULTY_PREFERENCES = {
+    "beginner": {"simple": 5.0, "clean": 4.0, "basic": 3.0},
+    "intermediate": {"balanced": 5.0, "standard": 4.0, "detailed": 3.0},
+    "advanced": {"comprehensive": 5.0, "detailed": 4.0, "complex": 3.0}
+}
+
+_COMPLEXITY_KEYWORDS = {
+    1: ("simple", "basic", "clean"),
+    2: ("clear", "standard"),
+    3: ("balanced", "detailed"),
+    4: ("comprehensive", "advanced"),
+    5: ("complex", "detailed", "thorough")
+}
+
+# Preferred keywords per LLM-suggested teaching approach
+_APPROACH_KEYWORDS = {
+    "visual": ("visual", "diagram", "chart", "graphic"),
+    "step-by-step": ("step", "process", "sequential", "ordered"),
+    "example-driven": ("example", "case", "instance", "sample")
+}
+
+_CATEGORY_PREFERENCES = {
+    "title-objective": ("clean", "simple", "clear"),
+    "definition": ("clear", "concise", "focused"),
+    "examples": ("practical", "concrete", "relatable"),
+    "step-by-step": ("sequential", "ordered", "process"),
+    "analogy": ("visual", "comparison", "relatable"),
+    "common-mistakes": ("warning", "caution", "avoid"),
+    "mini-recap": ("summary", "concise", "key"),
+    "things-to-ponder": ("thought", "question", "reflection")
+}
+
 @dataclass
 class ContainerSize:
     width: int
@@ -45,8 +78,10 @@ class TemplateService:
     
     def __init__(self):
         self.templates_cache: Dict[str, Dict] = {}
+        self.category_index: Dict[str, List[Dict]] = {}
         self.templates_dir = Path(__file__).parent.parent / "data" / "templates"
         self._load_templates()
+        self._build_category_index()
     
     def _load_templates(self):
         """Load all template files into cache"""
@@ -83,22 +118,22 @@ class TemplateService:
         except Exception as e:
             logger.error(f"Failed to load templates: {e}")
     
-    def get_all_templates(self) -> List[Dict]:
-        """Get list of all available templates with metadata"""
-        return [
-            {
+    def _build_category_index(self):
+        """Bucket template summaries by category once, since the catalog is static after load"""
+        self.category_index = {}
+        for template in self.templates_cache.values():
+            category = template.get("category", "misc")
+            self.category_index.setdefault(category, []).append({
                 "id": template["id"],
                 "name": template["name"],
                 "description": template["description"],
-                "category": template.get("category", "misc"),
+                "category": category,
                 "templateVariant": template.get("templateVariant", 1),
                 "slideCount": len(template["slides"])
-            }
-            for template in self.templates_cache.values()
-        ]
+            })
     
-    def get_templates_by_category(self, category: str) -> List[Dict]:
-        """Get templates filtered by category"""
+    def get_all_templates(self) -> List[Dict]:
+        """Get list of all available templates with metadata"""
         return [
             {
                 "id": template["id"],
@@ -109,9 +144,12 @@ class TemplateService:
                 "slideCount": len(template["slides"])
             }
             for template in self.templates_cache.values()
-            if template.get("category", "misc") == category
         ]
     
+    def get_templates_by_category(self, category: str) -> List[Dict]:
+        """Get templates filtered by category"""
+        return list(self.category_index.get(category, []))
+    
     def get_available_categories(self) -> List[Dict]:
         """Get list of all available template categories with counts"""
         categories = {}
@@ -202,30 +240,16 @@ class TemplateService:
         variant = template.get("templateVariant", 1)
         score += variant * 2.0
         
-        # Difficulty level matching
-        difficulty_preferences = {
-            "beginner": {"simple": 5.0, "clean": 4.0, "basic": 3.0},
-            "intermediate": {"balanced": 5.0, "standard": 4.0, "detailed": 3.0},
-            "advanced": {"comprehensive": 5.0, "detailed": 4.0, "complex": 3.0}
-        }
-        
         template_name_lower = template.get("name", "").lower()
         template_desc_lower = template.get("description", "").lower()
         
-        for keyword, bonus in difficulty_preferences.get(difficulty_level, {}).items():
+        # Difficulty level matching
+        for keyword, bonus in _DIFFICULTY_PREFERENCES.get(difficulty_level, {}).items():
             if keyword in template_name_lower or keyword in template_desc_lower:
                 score += bonus
         
         # Content complexity matching
-        complexity_keywords = {
-            1: ["simple", "basic", "clean"],
-            2: ["clear", "standard"],
-            3: ["balanced", "detailed"],
-            4: ["comprehensive", "advanced"],
-            5: ["complex", "detailed", "thorough"]
-        }
-        
-        for keyword in complexity_keywords.get(content_complexity, []):
+        for keyword in _COMPLEXITY_KEYWORDS.get(content_complexity, ()):
             if keyword in template_name_lower or keyword in template_desc_lower:
                 score += 3.0
         
@@ -233,41 +257,14 @@ class TemplateService:
         if topic_analysis:
             teaching_approach = topic_analysis.get("teaching_approach", "").lower()
             
-            # Visual approach preferences
-            if teaching_approach == "visual":
-                visual_keywords = ["visual", "diagram", "chart", "graphic"]
-                for keyword in visual_keywords:
-                    if keyword in template_name_lower or keyword in template_desc_lower:
-                        score += 4.0
-            
-            # Step-by-step approach preferences
-            elif teaching_approach == "step-by-step":
-                process_keywords = ["step", "process", "sequential", "ordered"]
-                for keyword in process_keywords:
-                    if keyword in template_name_lower or keyword in template_desc_lower:
-                        score += 4.0
-            
-            # Example-driven approach preferences
-            elif teaching_approach == "example-driven":
-                example_keywords = ["example", "case", "instance", "sample"]
-                for keyword in example_keywords:
-                    if keyword in template_name_lower or keyword in template_desc_lower:
-                        score += 4.0
+            # Visual, step-by-step and example-driven approaches each prefer matching templates
+            for keyword in _APPROACH_KEYWORDS.get(teaching_approach, ()):
+                if keyword in template_name_lower or keyword in template_desc_lower:
+                    score += 4.0
         
         # Category-specific preferences
-        category_preferences = {
-            "title-objective": ["clean", "simple", "clear"],
-            "definition": ["clear", "concise", "focused"],
-            "examples": ["practical", "concrete", "relatable"],
-            "step-by-step": ["sequential", "ordered", "process"],
-            "analogy": ["visual", "comparison", "relatable"],
-            "common-mistakes": ["warning", "caution", "avoid"],
-            "mini-recap": ["summary", "concise", "key"],
-            "things-to-ponder": ["thought", "question", "reflection"]
-        }
-        
         template_category = template.get("category", "")
-        for keyword in category_preferences.get(template_category, []):
+        for keyword in _CATEGORY_PREFERENCES.get(template_category, ()):
             if keyword in template_name_lower or keyword in template_desc_lower:
                 score += 2.0
         
@@ -1,21 +1,116 @@
 import asyncio
+import base64
+import contextlib
 import hashlib
 import os
-import subprocess
+import tempfile
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, AsyncGenerator
-import aiofiles
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Tuple, AsyncGenerator
 import logging
 from config import settings
 import wave
-import io
 import re
 import json
-from dataclasses import dataclass
+import orjson
+import struct
+import heapq
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from functools import lru_cache
 from .voice_repository import voice_repository_service
+from utils.ttl_cache import TTLCache
+
+if TYPE_CHECKING:
+    # Only for annotations; piper is imported lazily when a voice is first loaded
+    from piper import PiperVoice
 
 logger = logging.getLogger(__name__)
 
+# Audio and chunk ids only name cache files, so the fastest available hash is used
+try:
+    from blake3 import blake3 as _id_hasher
+except ImportError:
+    _id_hasher = hashlib.sha256
+
+# Audio ids are 128-bit digests in unpadded lowercase base32 (26 characters; base32 rather than
+# base64 so ids stay distinct on case-insensitive filesystems). Files cached before that used
+# 64-character hex ids and are still served.
+_AUDIO_ID_RE = re.compile(r'[a-z2-7]{26}|[0-9a-f]{64}')
+
+@lru_cache(maxsize=4096)
+def _audio_id_for(text: str, voice: str) -> str:
+    """Audio id for a text and voice; memoized because the routers and generate_audio look up the same text repeatedly"""
+    digest = _id_hasher(f"{text}_{voice}".encode()).digest()[:16]
+    return base64.b32encode(digest).rstrip(b'=').decode().lower()
+
+# A sentence with its closing punctuation and trailing whitespace (the last one may be unterminated)
+_SENTENCE_RE = re.compile(r'[^.!?]+(?:[.!?]+|$)\s*')
+
+# Counts words for duration estimates without materialising a list
+_WORD_RE = re.compile(r'\S+')
+
+# Emoji and symbol ranges that TTS would read aloud: emoticons, symbols & pictographs, transport &
+# map symbols, flags, dingbats and enclosed characters, removed in a single pass
+_EMOJI_RE = re.compile(
+    '[\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF'
+    '\U0001F1E0-\U0001F1FF\U00002702-\U000027B0\U000024C2-\U0001F251]'
+)
+
+# Speaker labels at the start of a line that TTS would read aloud, in the order they were stripped
+_SPOKEN_PREFIX_RE = re.compile(
+    r'^(?:NARRATION:\s*)?(?:EXPLANATION:\s*)?(?:Step\s+\d+:\s*)?', re.IGNORECASE | re.MULTILINE
+)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Peak int16 amplitude below which generated audio is reported as near-silent (about -60 dBFS)
+_NEAR_SILENCE_PEAK = 32
+
+# Canonical 44-byte RIFF/WAVE header for the 16-bit mono PCM that Piper produces
+_WAV_HEADER = struct.Struct('<4sI4s4sIHHIIHH4sI')
+
+def _pack_wav_header(sample_rate: int, data_size: int) -> bytes:
+    """Build the WAV header for data_size bytes of 16-bit mono PCM"""
+    return _WAV_HEADER.pack(
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,  # PCM, mono, 16-bit
+        b'data', data_size
+    )
+
+@lru_cache(maxsize=1)
+def _cpu_supports_vnni() -> bool:
+    """Check for VNNI instructions; without them INT8 MatMul is slower than FP32"""
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    flags = line.split()
+                    return "avx512_vnni" in flags or "avx_vnni" in flags
+    except OSError:
+        pass
+    return False
+
+# Loaded voice models kept in memory at once; each holds its ONNX session (tens to hundreds of MB)
+_MAX_LOADED_VOICES = 3
+
+# Accelerated ONNX Runtime providers to try before the CPU, in order of preference
+_GPU_EXECUTION_PROVIDERS = ("CUDAExecutionProvider", "CoreMLExecutionProvider")
+
+@lru_cache(maxsize=1)
+def _select_execution_providers() -> Tuple[str, ...]:
+    """ONNX Runtime providers for Piper sessions, always ending with the CPU as a fallback"""
+    providers = ()
+    if settings.tts_prefer_gpu:
+        try:
+            import onnxruntime as ort
+            available = ort.get_available_providers()
+            providers = tuple(p for p in _GPU_EXECUTION_PROVIDERS if p in available)
+        except ImportError:
+            pass
+    return providers + ("CPUExecutionProvider",)
+
 @dataclass
 class TextChunk:
     """Represents a chunk of text for streaming TTS"""
@@ -34,6 +129,12 @@ class StreamingAudioChunk:
     error: Optional[str] = None
     actual_duration: Optional[float] = None  # Measured audio duration in seconds
 
+@dataclass
+class AudioCacheEntry:
+    """Access history of a cached audio file, used for LRU-2 eviction"""
+    size: int
+    access_times: Deque[float] = field(default_factory=lambda: deque(maxlen=2))  # Last two accesses (epoch seconds)
+
 @dataclass
 class VoiceCalibrationData:
     """Voice-specific calibration data for timing accuracy"""
@@ -62,6 +163,9 @@ class PiperTTSService:
         # Voice calibration system
         self.calibration_file = self.cache_dir / "voice_calibration.json"
         self.voice_calibrations: Dict[str, VoiceCalibrationData] = {}
+        self._calibration_version = 0
+        self._calibration_written_version = 0
+        self._calibration_write_lock = threading.Lock()
         
         # Ensure cache directory exists
         self.cache_dir.mkdir(parents=True, exist_ok=True)
@@ -73,6 +177,50 @@ class PiperTTSService:
         self._is_piper_available = None
         self._availability_checked = False
         
+        # Voice configurations are read once and then only on refresh_voice_configurations
+        self._voice_configs_loaded = False
+        
+        # Loaded PiperVoice models keyed by voice id, least recently used first; loading reads the
+        # ONNX model and builds an inference session, so it happens once per voice rather than once
+        # per request. At most _MAX_LOADED_VOICES stay loaded to bound memory.
+        self._voice_models: "OrderedDict[str, PiperVoice]" = OrderedDict()
+        self._voice_load_lock = asyncio.Lock()
+        
+        # Synthesis runs in worker threads; Piper's espeak-ng phonemizer keeps global state and is
+        # not thread-safe, so only one synthesis runs at a time
+        self._synthesis_lock = threading.Lock()
+        
+        # Bounds concurrent syntheses; streaming requests fan out one task per chunk, and each
+        # waiting synthesis would otherwise hold a worker thread or a piper process
+        self._synthesis_slots = asyncio.Semaphore(settings.tts_max_parallel)
+        
+        # Phonemized sentences keyed by (language, text), so the same text in another voice of
+        # the same language skips espeak-ng
+        self._phoneme_cache = TTLCache(maxsize=1024, ttl=3600)
+        
+        # Audio ids known to be on disk, so repeat lookups skip the stat() call. Entries expire
+        # in case files are removed behind the service's back.
+        self._cached_audio_ids = TTLCache(maxsize=4096, ttl=3600)
+        
+        # Syntheses currently running, keyed by audio id, so identical concurrent requests
+        # wait for one synthesis instead of running it twice
+        self._inflight: Dict[str, asyncio.Future] = {}
+        
+        # Access history of cached files for eviction. Restored from the last shutdown and
+        # reconciled with the directory on the first cleanup; afterwards the index is kept up to
+        # date in memory, so cleanups no longer scan the directory.
+        self.cache_index_file = self.cache_dir / ".index.json"
+        self._cache_index: Dict[str, AudioCacheEntry] = {}
+        self._cache_index_synced = False
+        self._load_cache_index()
+        
+        # Cache cleanup runs in the background every _cleanup_interval generations; the cache
+        # may overshoot its limit by up to that many files
+        self._generation_count = 0
+        self._cleanup_interval = max(16, self.max_cache_size // 10)
+        self._cleanup_lock = asyncio.Lock()
+        self._cleanup_tasks = set()
+        
         logger.info(f"PiperTTSService initialized with cache dir: {self.cache_dir}")
     
     async def _load_voice_configurations(self):
@@ -82,29 +230,19 @@ class PiperTTSService:
             installed_voices = await voice_repository_service.get_installed_voices()
             logger.info(f"Found {len(installed_voices)} installed voices from repository")
             
+            # Read the sample rates from the voice config files in a worker thread
+            sample_rates = await asyncio.to_thread(
+                lambda: [self._read_voice_sample_rate(voice.id) for voice in installed_voices]
+            )
+            
             # Clear existing configurations
             self.voice_configs.clear()
             
             # Add configurations for installed voices
-            for voice in installed_voices:
+            for voice, sample_rate in zip(installed_voices, sample_rates):
                 model_path = self.voices_dir / f"{voice.id}.onnx"
                 config_path = self.voices_dir / f"{voice.id}.onnx.json"
                 
-                logger.debug(f"Configuring voice {voice.id}: model={model_path.exists()}, config={config_path.exists()}")
-                
-                # Load audio configuration from the voice config file
-                sample_rate = 22050  # default fallback
-                if config_path.exists():
-                    try:
-                        import json
-                        with open(config_path, 'r') as f:
-                            config_data = json.load(f)
-                            if 'audio' in config_data and 'sample_rate' in config_data['audio']:
-                                sample_rate = config_data['audio']['sample_rate']
-                                logger.debug(f"Voice {voice.id} sample rate: {sample_rate}")
-                    except Exception as e:
-                        logger.warning(f"Could not read sample rate from {config_path}: {e}")
-                
                 self.voice_configs[voice.id] = {
                     "model_path": model_path,
                     "config_path": config_path,
@@ -119,6 +257,7 @@ class PiperTTSService:
                 logger.info(f"Default voice not found, using: {self.default_voice}")
             
             logger.info(f"Loaded {len(self.voice_configs)} voice configurations: {list(self.voice_configs.keys())}")
+            self._voice_configs_loaded = True
             
         except Exception as e:
             logger.error(f"Error loading voice configurations: {e}")
@@ -138,9 +277,25 @@ class PiperTTSService:
                 }
                 logger.info("Loaded fallback default voice configuration")
     
+    def _read_voice_sample_rate(self, voice_id: str) -> int:
+        """Read a voice's sample rate from its Piper config file, defaulting to 22050 Hz"""
+        config_path = self.voices_dir / f"{voice_id}.onnx.json"
+        try:
+            with open(config_path, 'rb') as f:
+                sample_rate = orjson.loads(f.read()).get('audio', {}).get('sample_rate', 22050)
+            logger.debug(f"Voice {voice_id} sample rate: {sample_rate}")
+            return sample_rate
+        except FileNotFoundError:
+            logger.debug(f"Voice {voice_id} has no config file at {config_path}")
+        except Exception as e:
+            logger.warning(f"Could not read sample rate from {config_path}: {e}")
+        return 22050
+    
     async def refresh_voice_configurations(self):
         """Refresh voice configurations after voices are downloaded or deleted"""
         self._availability_checked = False
+        # Voices may have been replaced or deleted on disk
+        self._voice_models.clear()
         await self._load_voice_configurations()
         logger.info(f"Voice configurations refreshed: {len(self.voice_configs)} voices loaded")
         # Reload calibration data after voice refresh
@@ -169,7 +324,7 @@ class PiperTTSService:
             self.voice_calibrations = {}
     
     def _save_voice_calibrations(self):
-        """Save voice calibration data to file"""
+        """Save voice calibration data to file (in a worker thread when called from the event loop)"""
         try:
             data = {}
             for voice_id, cal_data in self.voice_calibrations.items():
@@ -182,12 +337,70 @@ class PiperTTSService:
                     'confidence_score': cal_data.confidence_score
                 }
             
-            with open(self.calibration_file, 'w') as f:
-                json.dump(data, f, indent=2)
-            logger.debug(f"Saved calibration data for {len(self.voice_calibrations)} voices")
+            # Serialized here so later updates cannot change the data while it is being written
+            payload = json.dumps(data, indent=2)
+            self._calibration_version += 1
+            try:
+                asyncio.get_running_loop().run_in_executor(
+                    None, self._write_voice_calibrations, payload, self._calibration_version
+                )
+            except RuntimeError:
+                self._write_voice_calibrations(payload, self._calibration_version)
         except Exception as e:
             logger.error(f"Error saving voice calibrations: {e}")
     
+    def _write_voice_calibrations(self, payload: str, version: int):
+        """Write serialized calibrations unless a newer version has already been written"""
+        with self._calibration_write_lock:
+            if version <= self._calibration_written_version:
+                return
+            try:
+                temp_file = self.calibration_file.with_suffix(".tmp")
+                with open(temp_file, 'w') as f:
+                    f.write(payload)
+                os.replace(temp_file, self.calibration_file)
+                self._calibration_written_version = version
+                logger.debug(f"Saved voice calibration data (version {version})")
+            except Exception as e:
+                logger.error(f"Error saving voice calibrations: {e}")
+    
+    def _load_cache_index(self):
+        """Load the audio cache access history saved at the last shutdown"""
+        try:
+            if self.cache_index_file.exists():
+                with open(self.cache_index_file, 'r') as f:
+                    data = json.load(f)
+                for audio_id, (size, access_times) in data.items():
+                    self._cache_index[audio_id] = AudioCacheEntry(size, deque(access_times, maxlen=2))
+                logger.info(f"Loaded audio cache index with {len(self._cache_index)} entries")
+        except Exception as e:
+            logger.error(f"Error loading audio cache index: {e}")
+            self._cache_index = {}
+    
+    def save_cache_index(self):
+        """Save the audio cache access history so eviction order survives restarts (called on application shutdown)"""
+        try:
+            data = {
+                audio_id: [entry.size, list(entry.access_times)]
+                for audio_id, entry in self._cache_index.items()
+            }
+            temp_file = self.cache_index_file.with_suffix(".tmp")
+            with open(temp_file, 'w') as f:
+                json.dump(data, f)
+            os.replace(temp_file, self.cache_index_file)
+            logger.debug(f"Saved audio cache index with {len(data)} entries")
+        except Exception as e:
+            logger.error(f"Error saving audio cache index: {e}")
+    
+    def _record_audio_access(self, audio_id: str, size: Optional[int] = None):
+        """Note a use of a cached file (size is given when the file was just written)"""
+        entry = self._cache_index.get(audio_id)
+        if entry is None:
+            entry = self._cache_index[audio_id] = AudioCacheEntry(size or 0)
+        elif size is not None:
+            entry.size = size
+        entry.access_times.append(time.time())
+    
     def _measure_audio_duration(self, audio_path: Path) -> Optional[float]:
         """Measure the actual duration of generated audio file"""
         try:
@@ -307,7 +520,7 @@ class PiperTTSService:
         voice = voice or self.default_voice
         speaking_rate = self.get_voice_speaking_rate(voice)
         
-        word_count = len(text.split())
+        word_count = sum(1 for _ in _WORD_RE.finditer(text))
         base_duration = (word_count / speaking_rate) * 60
         
         # Add buffer time for pauses, punctuation, and TTS processing
@@ -343,8 +556,9 @@ class PiperTTSService:
                 self._is_piper_available = False
                 return False
         
-        # Load voice configurations
-        await self._load_voice_configurations()
+        # Load voice configurations, unless get_available_voices or a refresh already did
+        if not self._voice_configs_loaded:
+            await self._load_voice_configurations()
         
         # Check if any voices are available
         if not self.voice_configs:
@@ -369,6 +583,147 @@ class PiperTTSService:
         self._is_piper_available = True
         return True
     
+    async def _get_voice(self, voice_id: str) -> "PiperVoice":
+        """Get the loaded PiperVoice for a voice, loading it on first use"""
+        piper_voice = self._voice_models.get(voice_id)
+        if piper_voice is not None:
+            self._voice_models.move_to_end(voice_id)
+            return piper_voice
+        
+        async with self._voice_load_lock:
+            # Another request may have loaded it while we waited for the lock
+            piper_voice = self._voice_models.get(voice_id)
+            if piper_voice is None:
+                voice_config = self.voice_configs[voice_id]
+                model_path = voice_config["model_path"]
+                logger.info(f"Loading Piper voice model: {voice_id}")
+                runtime_model_path = await asyncio.to_thread(self._maybe_quantize_model, model_path)
+                voice_config["runtime_model_path"] = runtime_model_path
+                piper_voice = await asyncio.to_thread(self._load_voice_model, model_path, runtime_model_path)
+                self._install_phoneme_cache(piper_voice, voice_config["language"])
+                self._voice_models[voice_id] = piper_voice
+                while len(self._voice_models) > _MAX_LOADED_VOICES:
+                    evicted_voice_id, _ = self._voice_models.popitem(last=False)
+                    logger.info(f"Unloaded Piper voice model: {evicted_voice_id}")
+            return piper_voice
+    
+    def _install_phoneme_cache(self, piper_voice: "PiperVoice", language: str) -> None:
+        """
+        Memoize a voice's espeak-ng phonemization, shared by all voices of the same language.
+        PiperVoice.synthesize phonemizes through self.phonemize, so an instance attribute wraps it.
+        Only called from synthesis threads holding _synthesis_lock, so the cache needs no extra locking.
+        """
+        phonemize = piper_voice.phonemize
+        phoneme_cache = self._phoneme_cache
+        
+        def cached_phonemize(text: str):
+            key = (language, text)
+            phonemes = phoneme_cache.get(key)
+            if phonemes is None:
+                phonemes = phonemize(text)
+                phoneme_cache.set(key, phonemes)
+            return phonemes
+        
+        piper_voice.phonemize = cached_phonemize
+    
+    async def warmup(self) -> None:
+        """Load the default voice and run a short synthesis so the first request skips model setup (called on application startup)"""
+        try:
+            if not self.use_python_piper or not await self.is_service_available():
+                return
+            piper_voice = await self._get_voice(self.default_voice)
+            await asyncio.to_thread(self._run_warmup_synthesis, piper_voice)
+            logger.info(f"Piper voice warmed up: {self.default_voice}")
+        except Exception as e:
+            logger.warning(f"Piper warmup skipped: {e!r}")
+    
+    def _run_warmup_synthesis(self, piper_voice: "PiperVoice") -> None:
+        # Exercises the phonemizer and ONNX Runtime's allocators and kernels once
+        with self._synthesis_lock:
+            for _ in piper_voice.synthesize("Hello.", syn_config=None):
+                pass
+    
+    def _maybe_quantize_model(self, model_path: Path) -> Path:
+        """
+        Return the INT8 copy of a voice model when quantization is enabled and the CPU has VNNI,
+        creating it on first use. Falls back to the FP32 model otherwise.
+        """
+        if not settings.tts_int8_quantization or not _cpu_supports_vnni():
+            return model_path
+        
+        if len(_select_execution_providers()) > 1:
+            # Dynamic INT8 quantization targets the CPU; GPUs run the FP32 model faster
+            return model_path
+        
+        quantized_path = model_path.with_suffix(".int8.onnx")
+        if quantized_path.exists() and quantized_path.stat().st_mtime >= model_path.stat().st_mtime:
+            return quantized_path
+        
+        try:
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            
+            logger.info(f"Quantizing voice model to INT8: {model_path.name}")
+            quantize_dynamic(
+                model_input=str(model_path),
+                model_output=str(quantized_path),
+                weight_type=QuantType.QInt8,
+                per_channel=True,
+                reduce_range=False
+            )
+            return quantized_path
+        except Exception as e:
+            logger.warning(f"INT8 quantization failed for {model_path.name}, using FP32 model: {e}")
+            return model_path
+    
+    def _load_voice_model(self, model_path: Path, runtime_model_path: Optional[Path] = None) -> "PiperVoice":
+        """
+        Load a Piper voice with a tuned ONNX Runtime session.
+        PiperVoice.load always builds its session with default options, so the session is
+        replaced with one that enables all graph fusions and sizes the thread pool explicitly.
+        The optimized graph is saved next to the model so later process starts skip fusion.
+        runtime_model_path (e.g. an INT8 copy) replaces the model used for inference.
+        """
+        from piper import PiperVoice
+        
+        piper_voice = PiperVoice.load(str(model_path))
+        model_path = runtime_model_path or model_path
+        
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            return piper_voice
+        
+        sess_options = ort.SessionOptions()
+        sess_options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        sess_options.intra_op_num_threads = settings.tts_onnx_threads or os.cpu_count() or 4
+        
+        providers = _select_execution_providers()
+        optimized_path = model_path.with_suffix(".opt.onnx")
+        if len(providers) > 1:
+            # Graphs optimized for a GPU provider are not portable, so they are not persisted
+            source_path = model_path
+            sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        elif optimized_path.exists() and optimized_path.stat().st_mtime >= model_path.stat().st_mtime:
+            # Already fused on a previous run
+            source_path = optimized_path
+            sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+        else:
+            source_path = model_path
+            sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            sess_options.optimized_model_filepath = str(optimized_path)
+        
+        try:
+            piper_voice.session = ort.InferenceSession(
+                str(source_path),
+                sess_options=sess_options,
+                providers=list(providers)
+            )
+            logger.info(f"Piper voice {model_path.name} running on {piper_voice.session.get_providers()[0]}")
+        except Exception as e:
+            logger.warning(f"Could not create tuned ONNX session for {model_path.name}, using Piper defaults: {e}")
+        
+        return piper_voice
+    
     async def is_service_available(self) -> bool:
         """Check if the TTS service is available"""
         return await self._check_piper_availability()
@@ -379,32 +734,28 @@ class PiperTTSService:
             return text
         
         # Remove emojis and other Unicode symbols that TTS may read aloud
-        text = re.sub(r'[\U0001F600-\U0001F64F]', '', text)  # Emoticons
-        text = re.sub(r'[\U0001F300-\U0001F5FF]', '', text)  # Symbols & pictographs
-        text = re.sub(r'[\U0001F680-\U0001F6FF]', '', text)  # Transport & map symbols
-        text = re.sub(r'[\U0001F1E0-\U0001F1FF]', '', text)  # Flags (iOS)
-        text = re.sub(r'[\U00002702-\U000027B0]', '', text)  # Dingbats
-        text = re.sub(r'[\U000024C2-\U0001F251]', '', text)  # Enclosed characters
+        text = _EMOJI_RE.sub('', text)
         
         # Remove common problematic prefixes that TTS reads aloud
-        text = re.sub(r'^(NARRATION|Narration):\s*', '', text, flags=re.IGNORECASE | re.MULTILINE)
-        text = re.sub(r'^(EXPLANATION|Explanation):\s*', '', text, flags=re.IGNORECASE | re.MULTILINE)
-        text = re.sub(r'^Step\s+\d+:\s*', '', text, flags=re.IGNORECASE | re.MULTILINE)
+        text = _SPOKEN_PREFIX_RE.sub('', text)
         
         # Clean up multiple spaces and normalize whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE_RE.sub(' ', text)
         
         return text.strip()
     
     def _generate_audio_id(self, text: str, voice: str = None) -> str:
         """Generate a unique ID for audio based on text and voice"""
-        voice = voice or self.default_voice
-        content = f"{text}_{voice}"
-        return hashlib.sha256(content.encode()).hexdigest()
+        return _audio_id_for(text, voice or self.default_voice)
+    
+    @staticmethod
+    def is_valid_audio_id(audio_id: str) -> bool:
+        """Check that an audio id has the shape of a generated id (and so is safe as a file name)"""
+        return _AUDIO_ID_RE.fullmatch(audio_id) is not None
     
     def _get_audio_path(self, audio_id: str) -> Path:
         """Get the file path for an audio ID"""
-        return self.cache_dir / f"{audio_id}.wav"
+        return self.cache_dir / (audio_id + ".wav")
     
     def _get_audio_url(self, audio_id: str) -> str:
         """Get the URL path for serving audio"""
@@ -413,8 +764,17 @@ class PiperTTSService:
     async def is_audio_cached(self, text: str, voice: str = None) -> Tuple[bool, str]:
         """Check if audio is already cached. Returns (is_cached, audio_id)"""
         audio_id = self._generate_audio_id(text, voice)
-        audio_path = self._get_audio_path(audio_id)
-        return audio_path.exists(), audio_id
+        return self._audio_file_exists(audio_id), audio_id
+    
+    def _audio_file_exists(self, audio_id: str) -> bool:
+        """Check whether an audio id is on disk, remembering positive results"""
+        if self._cached_audio_ids.get(audio_id):
+            return True
+        
+        if self._get_audio_path(audio_id).exists():
+            self._cached_audio_ids.set(audio_id, True)
+            return True
+        return False
     
     async def generate_audio(self, text: str, voice: str = None) -> Optional[str]:
         """
@@ -431,19 +791,42 @@ class PiperTTSService:
             logger.warning("Text became empty after sanitization")
             return None
         
+        # Check if audio is already cached; hits are served before any service or voice checks
+        is_cached, audio_id = await self.is_audio_cached(text, voice)
+        if is_cached:
+            logger.info(f"Audio already cached for ID: {audio_id}")
+            self._record_audio_access(audio_id)
+            return audio_id
+        
         # Check if Piper TTS is available
         if not await self.is_service_available():
             logger.warning("Piper TTS service is not available - cannot generate audio")
             return None
         
-        voice = voice or self.default_voice
+        if not voice:
+            # The availability check loads the installed voices and may pick a different default
+            voice = self.default_voice
+            audio_id = self._generate_audio_id(text, voice)
         
-        # Check if audio is already cached
-        is_cached, audio_id = await self.is_audio_cached(text, voice)
-        if is_cached:
-            logger.info(f"Audio already cached for ID: {audio_id}")
-            return audio_id
+        inflight = self._inflight.get(audio_id)
+        if inflight is not None:
+            # The same text and voice is already being synthesized; share its result
+            logger.debug(f"Joining in-flight TTS generation: {audio_id}")
+            return await asyncio.shield(inflight)
         
+        inflight = asyncio.get_running_loop().create_future()
+        self._inflight[audio_id] = inflight
+        generated_id = None
+        try:
+            async with self._synthesis_slots:
+                generated_id = await self._generate_audio_file(text, voice, audio_id)
+        finally:
+            del self._inflight[audio_id]
+            inflight.set_result(generated_id)
+        return generated_id
+    
+    async def _generate_audio_file(self, text: str, voice: str, audio_id: str) -> Optional[str]:
+        """Synthesize sanitized text into the cache file for audio_id. Returns audio_id, or None on failure."""
         # Check if voice is available
         if voice not in self.voice_configs:
             logger.error(f"Voice '{voice}' not available. Using default voice.")
@@ -465,121 +848,161 @@ class PiperTTSService:
         try:
             if self.use_python_piper:
                 # Use Python piper module
-                from piper import PiperVoice
-                
                 logger.info(f"Generating TTS audio using Python piper module: {audio_id}")
                 
-                # Load the voice model
-                piper_voice = PiperVoice.load(str(voice_config["model_path"]))
-                
-                # Generate audio
-                audio_bytes = b''
-                for chunk in piper_voice.synthesize(text, syn_config=None):
-                    audio_bytes += chunk.audio_int16_bytes
+                # Reuse the loaded voice model
+                piper_voice = await self._get_voice(voice)
                 
                 # Get the correct sample rate from voice configuration
                 sample_rate = voice_config.get("sample_rate", 22050)
                 
-                # Validate audio data
-                if not audio_bytes:
-                    logger.error("No audio data generated by Piper TTS")
-                    return None
-                
-                if len(audio_bytes) < 100:  # Minimum reasonable audio size
-                    logger.warning(f"Generated audio seems too short: {len(audio_bytes)} bytes")
-                
-                # Save as proper WAV file with headers
+                # Stream the audio into a WAV file as Piper produces it
                 try:
-                    with wave.open(str(audio_path), 'wb') as wav_file:
-                        wav_file.setnchannels(1)  # mono
-                        wav_file.setsampwidth(2)  # 16-bit
-                        wav_file.setframerate(sample_rate)  # use voice-specific sample rate
-                        wav_file.writeframes(audio_bytes)
+                    # Synthesis and file writes block, so they run off the event loop
+                    pcm_size = await asyncio.to_thread(
+                        self._synthesize_to_wav, piper_voice, text, audio_path, sample_rate
+                    )
                     
-                    # Validate the generated WAV file
-                    if not audio_path.exists() or audio_path.stat().st_size == 0:
-                        logger.error(f"Generated WAV file is empty or doesn't exist: {audio_path}")
+                    # Validate audio data
+                    if not pcm_size:
+                        logger.error("No audio data generated by Piper TTS")
                         return None
                     
-                    logger.debug(f"Generated WAV file: {audio_path.stat().st_size} bytes, sample rate: {sample_rate} Hz")
+                    if pcm_size < 100:  # Minimum reasonable audio size
+                        logger.warning(f"Generated audio seems too short: {pcm_size} bytes")
                     
-                except wave.Error as e:
+                    # The file was renamed into place complete, so its size is known without a stat()
+                    logger.debug(f"Generated WAV file: {_WAV_HEADER.size + pcm_size} bytes, sample rate: {sample_rate} Hz")
+                    
+                except OSError as e:
+                    # _synthesize_to_wav removes its temporary file on failure
                     logger.error(f"Error creating WAV file: {e}")
-                    # Clean up failed attempt
-                    if audio_path.exists():
-                        audio_path.unlink()
                     return None
                 
                 logger.info(f"Successfully generated TTS audio: {audio_id}")
-                
-                # Measure actual audio duration and update calibration
-                actual_duration = self._measure_audio_duration(audio_path)
-                if actual_duration:
-                    self._update_voice_calibration(voice, text, actual_duration)
-                
-                # Clean up cache if needed
-                await self._cleanup_cache()
-                
+                self._register_generated_audio(audio_id, voice, text, pcm_size, sample_rate)
                 return audio_id
             else:
-                # Use subprocess (original method)
+                # Use subprocess (original method), writing to a temporary file that is renamed
+                # into place only once Piper has finished
+                fd, temp_name = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{audio_id}.", suffix=".part")
+                os.close(fd)
+                
                 cmd = [
                     self.piper_path,
                     "--model", str(voice_config["model_path"]),
                     "--config", str(voice_config["config_path"]),
-                    "--output_file", str(audio_path)
+                    "--output_file", temp_name
                 ]
                 
                 logger.info(f"Generating TTS audio with command: {' '.join(cmd)}")
                 
-                # Run Piper TTS
-                process = await asyncio.create_subprocess_exec(
-                    *cmd,
-                    stdin=asyncio.subprocess.PIPE,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE
-                )
-                
-                stdout, stderr = await process.communicate(input=text.encode())
-                
-                if process.returncode == 0 and audio_path.exists():
-                    logger.info(f"Successfully generated TTS audio: {audio_id}")
-                    
-                    # Measure actual audio duration and update calibration
-                    actual_duration = self._measure_audio_duration(audio_path)
-                    if actual_duration:
-                        self._update_voice_calibration(voice, text, actual_duration)
-                    
-                    # Clean up cache if needed
-                    await self._cleanup_cache()
-                    
-                    return audio_id
-                else:
-                    logger.error(f"Piper TTS failed with return code {process.returncode}")
-                    logger.error(f"Stderr: {stderr.decode()}")
+                try:
+                    # Run Piper TTS
+                    process = await asyncio.create_subprocess_exec(
+                        *cmd,
+                        stdin=asyncio.subprocess.PIPE,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.PIPE
+                    )
                     
-                    # Clean up failed attempt
-                    if audio_path.exists():
-                        audio_path.unlink()
+                    stdout, stderr = await process.communicate(input=text.encode())
                     
-                    return None
+                    file_size = os.path.getsize(temp_name)
+                    if process.returncode == 0 and file_size > 0:
+                        os.replace(temp_name, audio_path)
+                        logger.info(f"Successfully generated TTS audio: {audio_id}")
+                        self._cached_audio_ids.set(audio_id, True)
+                        self._record_audio_access(audio_id, file_size)
+                        
+                        # Measure actual audio duration and update calibration
+                        actual_duration = await asyncio.to_thread(self._measure_audio_duration, audio_path)
+                        if actual_duration:
+                            self._update_voice_calibration(voice, text, actual_duration)
+                        
+                        # Clean up cache if needed
+                        self._schedule_cache_cleanup()
+                        
+                        return audio_id
+                    else:
+                        logger.error(f"Piper TTS failed with return code {process.returncode}")
+                        logger.error(f"Stderr: {stderr.decode()}")
+                        return None
+                finally:
+                    # Clean up failed attempt (after a successful rename there is nothing left)
+                    with contextlib.suppress(FileNotFoundError):
+                        os.unlink(temp_name)
                 
         except Exception as e:
+            # Audio only reaches its final path once complete, so there is nothing to clean up here
             logger.error(f"Error generating TTS audio: {e}")
+            return None
+    
+    def _register_generated_audio(self, audio_id: str, voice: str, text: str, pcm_size: int, sample_rate: int):
+        """Record a cache file just written by the Python Piper path"""
+        self._cached_audio_ids.set(audio_id, True)
+        self._record_audio_access(audio_id, _WAV_HEADER.size + pcm_size)
+        
+        # Duration follows from the 16-bit mono PCM size, no need to re-read the file
+        self._update_voice_calibration(voice, text, pcm_size / (2 * sample_rate))
+        
+        # Clean up cache if needed
+        self._schedule_cache_cleanup()
+    
+    def _synthesize_to_wav(self, piper_voice: "PiperVoice", text: str, audio_path: Path, sample_rate: int) -> int:
+        """
+        Synthesize text straight into a WAV file, one sentence chunk at a time, so memory use does
+        not grow with the length of the text. The audio is written to a temporary file in the
+        cache directory and renamed into place, so a half-written file is never seen as cached.
+        Returns the number of PCM bytes written; nothing is left on disk when it is 0.
+        """
+        fd, temp_name = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{audio_path.stem}.", suffix=".part")
+        
+        pcm_size = 0
+        peak = 0
+        try:
+            with os.fdopen(fd, 'wb') as wav_file, self._synthesis_lock:
+                # Reserve the header, stream the PCM, then fill in the final sizes
+                wav_file.seek(_WAV_HEADER.size)
+                write = wav_file.write
+                for chunk in piper_voice.synthesize(text, syn_config=None):
+                    # Write the int16 numpy array through the buffer protocol; audio_int16_bytes
+                    # would make an extra tobytes() copy of every chunk
+                    pcm = chunk.audio_int16_array
+                    write(pcm)
+                    pcm_size += pcm.nbytes
+                    if pcm.size:
+                        # Vectorized min/max over the int16 samples; abs() would overflow on -32768
+                        peak = max(peak, int(pcm.max()), -int(pcm.min()))
+                
+                wav_file.seek(0)
+                wav_file.write(_pack_wav_header(sample_rate, pcm_size))
             
-            # Clean up failed attempt
-            if audio_path.exists():
-                audio_path.unlink()
+            if pcm_size and peak < _NEAR_SILENCE_PEAK:
+                logger.warning(f"Generated audio is near-silent (peak amplitude {peak}): {audio_path.stem}")
             
-            return None
+            if pcm_size:
+                os.replace(temp_name, audio_path)
+            else:
+                os.unlink(temp_name)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(temp_name)
+            raise
+        
+        return pcm_size
     
     async def get_audio_file_path(self, audio_id: str) -> Optional[Path]:
         """Get the file path for an audio ID if it exists"""
-        audio_path = self._get_audio_path(audio_id)
-        return audio_path if audio_path.exists() else None
+        if not self._audio_file_exists(audio_id):
+            return None
+        self._record_audio_access(audio_id)
+        return self._get_audio_path(audio_id)
     
     async def delete_audio(self, audio_id: str) -> bool:
         """Delete a cached audio file"""
+        self._cached_audio_ids.pop(audio_id)
+        self._cache_index.pop(audio_id, None)
         audio_path = self._get_audio_path(audio_id)
         if audio_path.exists():
             try:
@@ -591,16 +1014,28 @@ class PiperTTSService:
                 return False
         return False
     
+    def _scan_audio_files(self) -> List[os.DirEntry]:
+        """List cached WAV files; DirEntry keeps its stat() result, so each file is stat'ed at most once"""
+        with os.scandir(self.cache_dir) as entries:
+            return [entry for entry in entries if entry.name.endswith(".wav") and entry.is_file(follow_symlinks=False)]
+    
+    def _scan_cache_totals(self) -> Tuple[int, int]:
+        """Return (file count, total bytes) of the cached WAV files"""
+        audio_files = self._scan_audio_files()
+        return len(audio_files), sum(entry.stat(follow_symlinks=False).st_size for entry in audio_files)
+    
     async def clear_cache(self) -> int:
         """Clear all cached audio files. Returns number of files deleted."""
         deleted_count = 0
+        self._cached_audio_ids.clear()
+        self._cache_index.clear()
         try:
-            for audio_file in self.cache_dir.glob("*.wav"):
+            for audio_file in self._scan_audio_files():
                 try:
-                    audio_file.unlink()
+                    os.unlink(audio_file.path)
                     deleted_count += 1
                 except Exception as e:
-                    logger.error(f"Error deleting file {audio_file}: {e}")
+                    logger.error(f"Error deleting file {audio_file.path}: {e}")
             
             logger.info(f"Cleared TTS cache: deleted {deleted_count} files")
             return deleted_count
@@ -609,33 +1044,106 @@ class PiperTTSService:
             logger.error(f"Error clearing TTS cache: {e}")
             return deleted_count
     
+    def _schedule_cache_cleanup(self):
+        """Count a generated file and start a background cache cleanup every _cleanup_interval files"""
+        self._generation_count += 1
+        if self._generation_count % self._cleanup_interval or self._cleanup_lock.locked():
+            return
+        
+        task = asyncio.create_task(self._cleanup_cache())
+        self._cleanup_tasks.add(task)
+        task.add_done_callback(self._cleanup_tasks.discard)
+    
     async def _cleanup_cache(self):
-        """Clean up old cache files if cache size exceeds limit"""
-        try:
-            audio_files = list(self.cache_dir.glob("*.wav"))
-            
-            if len(audio_files) <= self.max_cache_size:
-                return
-            
-            # Sort by modification time (oldest first)
-            audio_files.sort(key=lambda f: f.stat().st_mtime)
-            
-            # Delete oldest files
-            files_to_delete = len(audio_files) - self.max_cache_size
-            for audio_file in audio_files[:files_to_delete]:
+        """Clean up cache files if cache size exceeds limit, evicting least recently used (LRU-2) first"""
+        # Overlapping cleanups would race to delete the same files
+        async with self._cleanup_lock:
+            try:
+                if not self._cache_index_synced:
+                    await self._sync_cache_index()
+                
+                excess = len(self._cache_index) - self.max_cache_size
+                if excess <= 0:
+                    return
+                
+                evicted_ids = heapq.nsmallest(excess, self._cache_index, key=self._eviction_priority)
+                for audio_id in evicted_ids:
+                    del self._cache_index[audio_id]
+                    self._cached_audio_ids.pop(audio_id)
+                
+                await asyncio.to_thread(self._delete_audio_files, evicted_ids)
+                
+            except Exception as e:
+                logger.error(f"Error during cache cleanup: {e}")
+    
+    def _eviction_priority(self, audio_id: str) -> Tuple[float, float]:
+        """
+        LRU-2 order: files are ranked by their second most recent access, so files used only
+        once (e.g. a burst of one-off texts) go before files that keep being replayed.
+        Ties, including all single-use files, fall back to the most recent access.
+        """
+        access_times = self._cache_index[audio_id].access_times
+        if not access_times:
+            return 0.0, 0.0
+        second_last = access_times[0] if len(access_times) == 2 else 0.0
+        return second_last, access_times[-1]
+    
+    def _remove_stale_partial_files(self, older_than: float):
+        """Delete .part files left behind by synthesis runs that were interrupted before os.replace"""
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".part"):
+                    continue
                 try:
-                    audio_file.unlink()
-                    logger.info(f"Cleaned up old audio file: {audio_file.name}")
+                    if entry.stat(follow_symlinks=False).st_mtime < older_than:
+                        os.unlink(entry.path)
+                        logger.info(f"Removed stale partial audio file: {entry.name}")
+                except FileNotFoundError:
+                    pass
                 except Exception as e:
-                    logger.error(f"Error deleting old audio file {audio_file}: {e}")
-                    
-        except Exception as e:
-            logger.error(f"Error during cache cleanup: {e}")
+                    logger.error(f"Error removing partial audio file {entry.name}: {e}")
+    
+    async def _sync_cache_index(self):
+        """Reconcile the index with the files on disk (once per process, in a worker thread)"""
+        scan_started = time.time()
+        await asyncio.to_thread(self._remove_stale_partial_files, scan_started - 3600)
+        on_disk = await asyncio.to_thread(
+            lambda: {entry.name[:-len(".wav")]: entry.stat() for entry in self._scan_audio_files()}
+        )
+        
+        for audio_id in self._cache_index.keys() - on_disk.keys():
+            # Keep files written while the scan was running
+            access_times = self._cache_index[audio_id].access_times
+            if not access_times or access_times[-1] < scan_started:
+                del self._cache_index[audio_id]
+        for audio_id, stat_result in on_disk.items():
+            entry = self._cache_index.get(audio_id)
+            if entry is None:
+                # Unknown history: treat the last write as the only access
+                entry = self._cache_index[audio_id] = AudioCacheEntry(stat_result.st_size)
+                entry.access_times.append(stat_result.st_mtime)
+            entry.size = stat_result.st_size
+        
+        self._cache_index_synced = True
+        logger.info(f"Audio cache index synced: {len(self._cache_index)} files")
+    
+    def _delete_audio_files(self, audio_ids: List[str]):
+        """Delete evicted cache files"""
+        for audio_id in audio_ids:
+            try:
+                os.unlink(self._get_audio_path(audio_id))
+                logger.info(f"Cleaned up old audio file: {audio_id}.wav")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.error(f"Error deleting old audio file {audio_id}.wav: {e}")
     
     async def get_available_voices(self) -> List[Dict[str, str]]:
         """Get list of available voices"""
-        # Ensure voice configurations are loaded
-        await self._load_voice_configurations()
+        # Voice configurations are loaded once (by the availability check or here) and reloaded
+        # by refresh_voice_configurations when voices are downloaded or deleted
+        if not self._voice_configs_loaded:
+            await self._load_voice_configurations()
         
         voices = []
         for voice_id, config in self.voice_configs.items():
@@ -650,11 +1158,11 @@ class PiperTTSService:
     async def get_cache_stats(self) -> Dict[str, any]:
         """Get statistics about the TTS cache"""
         try:
-            audio_files = list(self.cache_dir.glob("*.wav"))
-            total_size = sum(f.stat().st_size for f in audio_files)
+            # Directory scan and stats run in a worker thread, off the event loop
+            file_count, total_size = await asyncio.to_thread(self._scan_cache_totals)
             
             return {
-                "total_files": len(audio_files),
+                "total_files": file_count,
                 "total_size_bytes": total_size,
                 "total_size_mb": round(total_size / (1024 * 1024), 2),
                 "cache_limit": self.max_cache_size,
@@ -696,45 +1204,31 @@ class PiperTTSService:
             logger.error(f"Piper TTS health check failed with exception: {e}")
             return False
 
+    @staticmethod
+    def _make_text_chunk(text: str, index: int) -> TextChunk:
+        """Build a streaming chunk; the id is a content fingerprint so clients can match chunks across streams"""
+        chunk_id = _id_hasher(f"{text}_{index}".encode()).hexdigest()[:16]
+        return TextChunk(text=text.strip(), index=index, chunk_id=chunk_id)
+    
     def _split_text_into_chunks(self, text: str, max_chunk_size: int = 200) -> List[TextChunk]:
         """Split text into optimal chunks for streaming TTS"""
         if not text.strip():
             return []
         
-        # First, split by sentences
-        sentence_endings = r'[.!?]+\s*'
-        sentences = re.split(sentence_endings, text.strip())
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
+        # Greedily pack whole sentences into chunks in one scan; the text is only sliced when a
+        # chunk is emitted
         chunks = []
-        current_chunk = ""
-        chunk_index = 0
-        
-        for sentence in sentences:
+        chunk_start = chunk_end = 0
+        for sentence in _SENTENCE_RE.finditer(text):
             # If adding this sentence would exceed max size, finalize current chunk
-            if current_chunk and len(current_chunk) + len(sentence) + 1 > max_chunk_size:
-                chunk_id = hashlib.sha256(f"{current_chunk}_{chunk_index}".encode()).hexdigest()[:16]
-                chunks.append(TextChunk(
-                    text=current_chunk.strip(),
-                    index=chunk_index,
-                    chunk_id=chunk_id
-                ))
-                current_chunk = sentence
-                chunk_index += 1
-            else:
-                if current_chunk:
-                    current_chunk += " " + sentence
-                else:
-                    current_chunk = sentence
+            if chunk_end > chunk_start and sentence.end() - chunk_start > max_chunk_size:
+                chunks.append(self._make_text_chunk(text[chunk_start:chunk_end], len(chunks)))
+                chunk_start = sentence.start()
+            chunk_end = sentence.end()
         
         # Add the last chunk if it exists
-        if current_chunk.strip():
-            chunk_id = hashlib.sha256(f"{current_chunk}_{chunk_index}".encode()).hexdigest()[:16]
-            chunks.append(TextChunk(
-                text=current_chunk.strip(),
-                index=chunk_index,
-                chunk_id=chunk_id
-            ))
+        if chunk_end > chunk_start:
+            chunks.append(self._make_text_chunk(text[chunk_start:chunk_end], len(chunks)))
         
         logger.info(f"Split text into {len(chunks)} chunks")
         return chunks
@@ -743,58 +1237,10 @@ class PiperTTSService:
         """Generate audio for multiple chunks in parallel"""
         voice = voice or self.default_voice
         
-        async def generate_single_chunk(chunk: TextChunk) -> StreamingAudioChunk:
-            try:
-                audio_id = await self.generate_audio(chunk.text, voice)
-                actual_duration = None
-                
-                # Get actual duration from generated audio if available
-                if audio_id:
-                    audio_path = self._get_audio_path(audio_id)
-                    actual_duration = self._measure_audio_duration(audio_path)
-                
-                return StreamingAudioChunk(
-                    chunk_id=chunk.chunk_id,
-                    audio_id=audio_id,
-                    index=chunk.index,
-                    text=chunk.text,
-                    is_ready=audio_id is not None,
-                    error=None if audio_id else "Generation failed",
-                    actual_duration=actual_duration
-                )
-            except Exception as e:
-                logger.error(f"Error generating chunk {chunk.chunk_id}: {e}")
-                return StreamingAudioChunk(
-                    chunk_id=chunk.chunk_id,
-                    audio_id=None,
-                    index=chunk.index,
-                    text=chunk.text,
-                    is_ready=False,
-                    error=str(e),
-                    actual_duration=None
-                )
-        
-        # Generate all chunks in parallel
-        tasks = [generate_single_chunk(chunk) for chunk in chunks]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Process results
-        streaming_chunks = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.error(f"Exception generating chunk {i}: {result}")
-                streaming_chunks.append(StreamingAudioChunk(
-                    chunk_id=chunks[i].chunk_id,
-                    audio_id=None,
-                    index=chunks[i].index,
-                    text=chunks[i].text,
-                    is_ready=False,
-                    error=str(result)
-                ))
-            else:
-                streaming_chunks.append(result)
-        
-        return streaming_chunks
+        # Generate all chunks in parallel (generate_audio bounds the syntheses themselves)
+        return list(await asyncio.gather(
+            *(self._generate_single_chunk_async(chunk, voice) for chunk in chunks)
+        ))
 
     async def generate_streaming_audio(self, text: str, voice: str = None, max_chunk_size: int = 200) -> AsyncGenerator[StreamingAudioChunk, None]:
         """
@@ -825,48 +1271,160 @@ class PiperTTSService:
         # Generate audio chunks in parallel but yield them in order
         logger.info(f"Generating streaming audio for {len(chunks)} chunks")
         
-        # Start generation for all chunks
-        generation_tasks = {}
+        # Synthesize the uncached chunks as one ordered series, then start a task per chunk that
+        # picks up its result (or a cached file); chunks are awaited in order, so each is yielded
+        # as soon as it and every chunk before it are ready
+        series_task = self._start_chunk_series(chunks, voice)
+        generation_tasks = [
+            asyncio.create_task(self._generate_single_chunk_async(chunk, voice))
+            for chunk in chunks
+        ]
+        
+        try:
+            for generation_task in generation_tasks:
+                yield await generation_task
+        finally:
+            # Stop outstanding chunks if the client goes away mid-stream
+            for generation_task in generation_tasks:
+                generation_task.cancel()
+            if series_task is not None:
+                series_task.cancel()
+    
+    def get_voice_sample_rate(self, voice: str = None) -> int:
+        """Sample rate of the PCM that a voice produces (the default voice for unknown voices)"""
+        voice_config = self.voice_configs.get(voice or self.default_voice) or self.voice_configs.get(self.default_voice, {})
+        return voice_config.get("sample_rate", 22050)
+    
+    async def generate_streaming_audio_pcm(self, text: str, voice: str = None) -> AsyncGenerator[bytes, None]:
+        """
+        Stream raw 16-bit little-endian mono PCM for the text, one block per sentence as Piper
+        synthesizes it, at get_voice_sample_rate(voice). Nothing is written to the cache, and the
+        client wraps the stream once instead of fetching and splicing a WAV per chunk.
+        Requires the Piper Python module.
+        """
+        text = self._sanitize_text_for_tts(text)
+        if not text:
+            logger.warning("Text became empty after sanitization for PCM streaming")
+            return
+        
+        if not self.use_python_piper or not await self.is_service_available():
+            logger.warning("Piper Python module is not available - cannot stream PCM audio")
+            return
+        
+        voice = voice or self.default_voice
+        if voice not in self.voice_configs:
+            logger.error(f"Voice '{voice}' not available. Using default voice.")
+            voice = self.default_voice
+        
+        loop = asyncio.get_running_loop()
+        blocks: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        
+        def synthesize_blocks(piper_voice: "PiperVoice") -> int:
+            pcm_size = 0
+            with self._synthesis_lock:
+                for chunk in piper_voice.synthesize(text, syn_config=None):
+                    if stop.is_set():
+                        break
+                    pcm = chunk.audio_int16_bytes
+                    pcm_size += len(pcm)
+                    loop.call_soon_threadsafe(blocks.put_nowait, pcm)
+            return pcm_size
+        
+        async with self._synthesis_slots:
+            piper_voice = await self._get_voice(voice)
+            synthesis = asyncio.create_task(asyncio.to_thread(synthesize_blocks, piper_voice))
+            # Runs after every block the thread queued, so it always comes last
+            synthesis.add_done_callback(lambda _: blocks.put_nowait(None))
+            try:
+                while (pcm := await blocks.get()) is not None:
+                    yield pcm
+                
+                pcm_size = await synthesis
+                if pcm_size and not stop.is_set():
+                    self._update_voice_calibration(voice, text, pcm_size / (2 * self.get_voice_sample_rate(voice)))
+            except Exception as e:
+                logger.error(f"Error streaming PCM audio: {e}")
+            finally:
+                # A client that goes away stops synthesis at the next sentence
+                stop.set()
+                if not synthesis.done():
+                    synthesis.cancel()
+    
+    def _start_chunk_series(self, chunks: List[TextChunk], voice: Optional[str]) -> Optional[asyncio.Task]:
+        """
+        Claim the uncached chunks of a streaming request and synthesize them in a single worker
+        thread, in chunk order. Claimed chunks are registered as in-flight, so the per-chunk
+        generate_audio calls wait for the series instead of starting their own synthesis.
+        Returns None when there is nothing to claim or the Python Piper module is not in use.
+        """
+        voice = voice or self.default_voice
+        if not self.use_python_piper or voice not in self.voice_configs:
+            return None
+        
+        loop = asyncio.get_running_loop()
+        claimed: Dict[str, asyncio.Future] = {}
+        series: List[Tuple[str, str]] = []
         for chunk in chunks:
-            task = asyncio.create_task(self._generate_single_chunk_async(chunk, voice))
-            generation_tasks[chunk.index] = task
+            # Same text and id that generate_audio derives for the chunk
+            text = self._sanitize_text_for_tts(chunk.text)
+            audio_id = self._generate_audio_id(text, voice)
+            if not text or audio_id in self._inflight or self._audio_file_exists(audio_id):
+                continue
+            claimed[audio_id] = self._inflight[audio_id] = loop.create_future()
+            series.append((audio_id, text))
         
-        # Yield chunks in order as they complete
-        yielded_indices = set()
-        pending_results = {}
+        if not series:
+            return None
+        return asyncio.create_task(self._synthesize_chunk_series(series, claimed, voice))
+    
+    async def _synthesize_chunk_series(self, series: List[Tuple[str, str]], claimed: Dict[str, asyncio.Future], voice: str):
+        """
+        Synthesize claimed chunks one after another in one worker thread, using one synthesis slot
+        and one thread hop for the whole request, and resolve each chunk as soon as its file lands.
+        Chunks that are never synthesized (failure or cancellation) resolve as failed.
+        """
+        loop = asyncio.get_running_loop()
+        sample_rate = self.voice_configs[voice].get("sample_rate", 22050)
+        stop = threading.Event()
         
-        while len(yielded_indices) < len(chunks):
-            # Check all pending tasks
-            for index, task in list(generation_tasks.items()):
-                if index in yielded_indices:
-                    continue
-                    
-                if task.done():
-                    try:
-                        result = await task
-                        pending_results[index] = result
-                        del generation_tasks[index]
-                    except Exception as e:
-                        logger.error(f"Error in streaming generation task {index}: {e}")
-                        pending_results[index] = StreamingAudioChunk(
-                            chunk_id=chunks[index].chunk_id,
-                            audio_id=None,
-                            index=index,
-                            text=chunks[index].text,
-                            is_ready=False,
-                            error=str(e)
-                        )
-                        del generation_tasks[index]
-            
-            # Yield any ready results in order
-            next_index = len(yielded_indices)
-            if next_index in pending_results:
-                yield pending_results[next_index]
-                yielded_indices.add(next_index)
-                del pending_results[next_index]
-            else:
-                # Wait a bit before checking again
-                await asyncio.sleep(0.1)
+        def release(audio_id: str, generated_id: Optional[str]):
+            inflight = claimed.pop(audio_id, None)
+            if inflight is None:
+                return
+            if self._inflight.get(audio_id) is inflight:
+                del self._inflight[audio_id]
+            inflight.set_result(generated_id)
+        
+        def finish(audio_id: str, text: str, pcm_size: int):
+            if pcm_size:
+                logger.info(f"Successfully generated TTS audio: {audio_id}")
+                self._register_generated_audio(audio_id, voice, text, pcm_size, sample_rate)
+            release(audio_id, audio_id if pcm_size else None)
+        
+        def synthesize_series(piper_voice: "PiperVoice"):
+            for audio_id, text in series:
+                if stop.is_set():
+                    return
+                try:
+                    pcm_size = self._synthesize_to_wav(piper_voice, text, self._get_audio_path(audio_id), sample_rate)
+                except Exception as e:
+                    logger.error(f"Error generating TTS audio {audio_id}: {e}")
+                    pcm_size = 0
+                loop.call_soon_threadsafe(finish, audio_id, text, pcm_size)
+        
+        try:
+            async with self._synthesis_slots:
+                piper_voice = await self._get_voice(voice)
+                logger.info(f"Generating {len(series)} TTS chunks in one series")
+                await asyncio.to_thread(synthesize_series, piper_voice)
+        except Exception as e:
+            logger.error(f"Error generating TTS chunk series: {e}")
+        finally:
+            # A cancelled series finishes the chunk it is on and skips the rest
+            stop.set()
+            for audio_id in list(claimed):
+                release(audio_id, None)
     
     async def _generate_single_chunk_async(self, chunk: TextChunk, voice: str = None) -> StreamingAudioChunk:
         """Generate audio for a single chunk asynchronously"""
@@ -877,7 +1435,7 @@ class PiperTTSService:
             # Get actual duration from generated audio if available
             if audio_id:
                 audio_path = self._get_audio_path(audio_id)
-                actual_duration = self._measure_audio_duration(audio_path)
+                actual_duration = await asyncio.to_thread(self._measure_audio_duration, audio_path)
             
             return StreamingAudioChunk(
                 chunk_id=chunk.chunk_id,
@@ -436,6 +436,11 @@ class VoiceRepositoryService:
         
         model_path = self.voices_dir / f"{voice_id}.onnx"
         config_path = self.voices_dir / f"{voice_id}.onnx.json"
+        # Optimized/quantized copies of the model written by the TTS service on first load
+        derived_model_paths = [
+            self.voices_dir / f"{voice_id}.{suffix}"
+            for suffix in ("opt.onnx", "int8.onnx", "int8.opt.onnx")
+        ]
         
         deleted = False
         
@@ -450,6 +455,11 @@ class VoiceRepositoryService:
                 deleted = True
                 logger.info(f"Deleted config file: {config_path}")
             
+            for derived_path in derived_model_paths:
+                if derived_path.exists():
+                    derived_path.unlink()
+                    logger.info(f"Deleted derived model file: {derived_path}")
+            
             if deleted:
                 # Invalidate cache after successful deletion
                 self._voice_cache = None
@@ -50,82 +50,11 @@ class ChunkGenerationConfig:
     maintain_continuity: bool = True
 
 
-class TimelinePromptTemplates:
-    """Template generator for timeline-based content creation"""
-    
-    @staticmethod
-    def get_chunk_generation_prompt(
-        topic: str,
-        chunk_config: ChunkGenerationConfig,
-        continuity_context: Optional[ContinuityContext] = None
-    ) -> str:
-        """
-        Generate a prompt for creating a timeline chunk with specific constraints.
-        
-        Args:
-            topic: The educational topic to cover
-            chunk_config: Configuration for chunk generation
-            continuity_context: Context from previous chunks for continuity
-            
-        Returns:
-            Formatted prompt string for LLM generation
-        """
-        
-        # Base instruction based on difficulty
-        difficulty_instructions = {
-            DifficultyLevel.BEGINNER: "Explain this like I'm 10 years old, using very simple language and relatable examples",
-            DifficultyLevel.INTERMEDIATE: "Explain this at a middle school level with clear examples and some technical terms",
-            DifficultyLevel.ADVANCED: "Explain this at a high school level with detailed examples and proper terminology"
-        }
-        
-        # Content type specific instructions
-        content_type_instructions = {
-            ContentType.DEFINITION: "Focus on clearly defining key concepts and their relationships",
-            ContentType.PROCESS: "Break down the process into clear, sequential steps",
-            ContentType.COMPARISON: "Highlight similarities and differences between concepts",
-            ContentType.EXAMPLE: "Provide concrete, relatable examples to illustrate the concept",
-            ContentType.LIST: "Organize information into clear, logical lists or categories",
-            ContentType.CONCEPT_MAP: "Show how different concepts connect and relate to each other",
-            ContentType.FORMULA: "Explain the formula components and their practical applications",
-            ContentType.STORY: "Present the information as an engaging narrative or story"
-        }
-        
-        # Build continuity section if context provided
-        continuity_section = ""
-        if continuity_context and chunk_config.maintain_continuity:
-            continuity_section = f"""
-CONTINUITY CONTEXT:
-- Previous concepts covered: {', '.join(continuity_context.previous_concepts)}
-- Current timeline position: {continuity_context.current_timestamp:.1f}s
-- Chunk number: {continuity_context.chunk_number}
-- Narrative thread: {continuity_context.narrative_thread}
-
-Continue naturally from the previous content while introducing new concepts.
-"""
-        
-        # Visual instruction section
-        visual_section = ""
-        if chunk_config.include_visual_instructions:
-            visual_section = """
-For each timeline event, include visual instructions using this format:
-VISUAL: [type: text|rectangle|arrow|ellipse|flowchart|callout] [position: center|left|right|top|bottom] [content: description] [importance: critical|high|medium|low]
-
-Examples:
-VISUAL: text center "Key Concept: Photosynthesis" critical
-VISUAL: rectangle left "Inputs: CO2 + H2O + Sunlight" high
-VISUAL: arrow center "Process Flow" medium
-"""
-        
-        # Build the complete prompt
-        prompt = f"""
-{difficulty_instructions[chunk_config.difficulty]}. 
+# Static parts of the chunk generation prompt. They come before anything topic-specific so
+# every chunk request shares the same prompt prefix and Ollama can reuse its cached evaluation.
+_CHUNK_PROMPT_HEADER = """You are writing one timed chunk of an educational lesson. The topic, audience, content focus and constraints for this chunk are given at the end.
 
-Topic: "{topic}"
-Content Type: {content_type_instructions[chunk_config.content_type]}
-
-CONSTRAINTS:
-- Target duration: {chunk_config.target_duration:.1f} seconds of content
-- Maximum tokens: {chunk_config.max_tokens}
+GENERAL GUIDELINES:
 - Keep content focused and engaging
 - Use conversational tone for narration
 
@@ -137,12 +66,10 @@ TTS-AWARE TIMING GUIDELINES:
 - Plan timing with actual speech patterns, not just word count
 - Include brief pauses for emphasis and comprehension
 
-{continuity_section}
-
 FORMAT YOUR RESPONSE as a JSON object with this structure:
-{{
+{
   "timeline_events": [
-    {{
+    {
       "timestamp": 0.0,
       "duration": 5.0,
       "event_type": "narration",
@@ -150,13 +77,13 @@ FORMAT YOUR RESPONSE as a JSON object with this structure:
       "word_count": 12,
       "estimated_speaking_time": 4.8,
       "visual_instruction": "VISUAL: text center 'Main Title' critical",
-      "layout_hints": {{
+      "layout_hints": {
         "semantic": "primary",
         "positioning": "center",
         "importance": "critical"
-      }}
-    }},
-    {{
+      }
+    },
+    {
       "timestamp": 5.0,
       "duration": 8.0,
       "event_type": "visual",
@@ -164,21 +91,31 @@ FORMAT YOUR RESPONSE as a JSON object with this structure:
       "word_count": 6,
       "estimated_speaking_time": 2.4,
       "visual_instruction": "VISUAL: rectangle left 'Concept Box' high",
-      "layout_hints": {{
+      "layout_hints": {
         "semantic": "supporting",
         "positioning": "left",
         "importance": "high"
-      }}
-    }}
+      }
+    }
   ],
   "chunk_summary": "Brief summary of concepts covered in this chunk",
   "next_chunk_hint": "Suggested direction for the next chunk",
   "concepts_introduced": ["concept1", "concept2"],
   "visual_elements_created": ["element1", "element2"]
-}}
+}
+"""
 
-{visual_section}
+_CHUNK_VISUAL_SECTION = """
+For each timeline event, include visual instructions using this format:
+VISUAL: [type: text|rectangle|arrow|ellipse|flowchart|callout] [position: center|left|right|top|bottom] [content: description] [importance: critical|high|medium|low]
+
+Examples:
+VISUAL: text center "Key Concept: Photosynthesis" critical
+VISUAL: rectangle left "Inputs: CO2 + H2O + Sunlight" high
+VISUAL: arrow center "Process Flow" medium
+"""
 
+_CHUNK_PROMPT_FOOTER = """
 Generate timeline events that naturally flow together and can be presented sequentially with proper timing.
 
 IMPORTANT TIMING NOTES:
@@ -187,8 +124,80 @@ IMPORTANT TIMING NOTES:
 - Ensure duration allows for comfortable speech pacing plus small buffer
 - For very short content (under 3 seconds estimated), increase duration to minimum 3 seconds
 - Account for natural speech patterns and pauses in your timing
+"""
+
+# Prompt prefixes with and without visual instructions, assembled once
+_CHUNK_PROMPT_PREFIXES = {
+    True: _CHUNK_PROMPT_HEADER + _CHUNK_VISUAL_SECTION + _CHUNK_PROMPT_FOOTER,
+    False: _CHUNK_PROMPT_HEADER + _CHUNK_PROMPT_FOOTER,
+}
+
+
+class TimelinePromptTemplates:
+    """Template generator for timeline-based content creation"""
+    
+    # Base instruction based on difficulty
+    DIFFICULTY_INSTRUCTIONS = {
+        DifficultyLevel.BEGINNER: "Explain this like I'm 10 years old, using very simple language and relatable examples",
+        DifficultyLevel.INTERMEDIATE: "Explain this at a middle school level with clear examples and some technical terms",
+        DifficultyLevel.ADVANCED: "Explain this at a high school level with detailed examples and proper terminology"
+    }
+    
+    # Content type specific instructions
+    CONTENT_TYPE_INSTRUCTIONS = {
+        ContentType.DEFINITION: "Focus on clearly defining key concepts and their relationships",
+        ContentType.PROCESS: "Break down the process into clear, sequential steps",
+        ContentType.COMPARISON: "Highlight similarities and differences between concepts",
+        ContentType.EXAMPLE: "Provide concrete, relatable examples to illustrate the concept",
+        ContentType.LIST: "Organize information into clear, logical lists or categories",
+        ContentType.CONCEPT_MAP: "Show how different concepts connect and relate to each other",
+        ContentType.FORMULA: "Explain the formula components and their practical applications",
+        ContentType.STORY: "Present the information as an engaging narrative or story"
+    }
+    
+    @staticmethod
+    def get_chunk_generation_prompt(
+        topic: str,
+        chunk_config: ChunkGenerationConfig,
+        continuity_context: Optional[ContinuityContext] = None
+    ) -> str:
+        """
+        Generate a prompt for creating a timeline chunk with specific constraints.
+        
+        Args:
+            topic: The educational topic to cover
+            chunk_config: Configuration for chunk generation
+            continuity_context: Context from previous chunks for continuity
+            
+        Returns:
+            Formatted prompt string for LLM generation
+        """
+        
+        # Build continuity section if context provided
+        continuity_section = ""
+        if continuity_context and chunk_config.maintain_continuity:
+            continuity_section = f"""
+CONTINUITY CONTEXT:
+- Previous concepts covered: {', '.join(continuity_context.previous_concepts)}
+- Current timeline position: {continuity_context.current_timestamp:.1f}s
+- Chunk number: {continuity_context.chunk_number}
+- Narrative thread: {continuity_context.narrative_thread}
+
+Continue naturally from the previous content while introducing new concepts.
+"""
+        
+        # Everything specific to this chunk goes last, after the shared static prefix
+        chunk_section = f"""{continuity_section}
+Topic: "{topic}"
+Audience: {TimelinePromptTemplates.DIFFICULTY_INSTRUCTIONS[chunk_config.difficulty]}.
+Content Type: {TimelinePromptTemplates.CONTENT_TYPE_INSTRUCTIONS[chunk_config.content_type]}
+
+CONSTRAINTS:
+- Target duration: {chunk_config.target_duration:.1f} seconds of content
+- Maximum tokens: {chunk_config.max_tokens}
 """
         
+        prompt = _CHUNK_PROMPT_PREFIXES[chunk_config.include_visual_instructions] + chunk_section
         return prompt.strip()
     
     @staticmethod
@@ -239,9 +248,7 @@ Focus on maintaining educational progression and avoiding repetition.
         """
         
         return f"""
-Analyze the educational topic "{topic}" and determine optimal chunking strategy.
-
-Current complexity estimate: {estimated_complexity:.2f} (0.0 = very simple, 1.0 = very complex)
+Analyze the educational topic given at the end and determine optimal chunking strategy.
 
 Consider:
 1. Concept density - how many new ideas need to be introduced
@@ -263,6 +270,9 @@ Base recommendations:
 - Small chunks: 15-20 seconds, simple concepts, minimal visuals
 - Medium chunks: 25-35 seconds, moderate concepts, some visuals  
 - Large chunks: 40-60 seconds, complex concepts, rich visuals
+
+Topic: "{topic}"
+Current complexity estimate: {estimated_complexity:.2f} (0.0 = very simple, 1.0 = very complex)
 """
 
 
@@ -302,14 +312,14 @@ Target {duration} seconds. Format as JSON with timeline_events array.
 """
 
 
+_TEMPLATES_BY_CONTENT_TYPE = {
+    ContentType.DEFINITION: QUICK_DEFINITION_TEMPLATE,
+    ContentType.PROCESS: PROCESS_EXPLANATION_TEMPLATE,
+    ContentType.COMPARISON: COMPARISON_TEMPLATE,
+    # Add more templates as needed
+}
+
+
 def get_template_for_content_type(content_type: ContentType) -> str:
     """Get the appropriate template for a given content type"""
-    
-    templates = {
-        ContentType.DEFINITION: QUICK_DEFINITION_TEMPLATE,
-        ContentType.PROCESS: PROCESS_EXPLANATION_TEMPLATE,
-        ContentType.COMPARISON: COMPARISON_TEMPLATE,
-        # Add more templates as needed
-    }
-    
-    return templates.get(content_type, QUICK_DEFINITION_TEMPLATE)
\ No newline at end of file
+    return _TEMPLATES_BY_CONTENT_TYPE.get(content_type, QUICK_DEFINITION_TEMPLATE)
\ No newline at end of file
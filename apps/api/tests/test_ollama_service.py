@@ -0,0 +1,62 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from services.ollama_service import LessonStreamInterrupted, ollama_service
+
+LESSON = (
+    "Step 1: Seeds\n"
+    "EXPLANATION: A seed holds a tiny plant and its food.\n"
+    "NARRATION: Every plant starts as a seed.\n"
+    "Step 2: Roots\n"
+    "EXPLANATION: Roots pull water"
+)
+
+
+class RecordedStep(SimpleNamespace):
+    """Stand-in for a parsed step, recording its title and sections"""
+    
+    def model_copy(self, deep=False):
+        return self
+
+
+def _stream_lesson(monkeypatch, response):
+    """Replace the Ollama request with one that streams LESSON in small tokens and returns response"""
+    async def fake_make_request(prompt, user_id="default", on_token=None, system=None):
+        for start in range(0, len(LESSON), 5):
+            on_token(LESSON[start:start + 5])
+            await asyncio.sleep(0)
+        return response
+    
+    # Record flushed steps by title and sections; this test covers when steps are flushed, not
+    # how the step model is built
+    def record_step(steps, title, sections, with_visuals):
+        steps.append(RecordedStep(title=title, sections=sections))
+    
+    monkeypatch.setattr(ollama_service, "_make_request", fake_make_request)
+    monkeypatch.setattr(ollama_service, "_flush_step", record_step)
+
+
+@pytest.mark.asyncio
+async def test_stream_lesson_steps_flushes_last_step_on_success(monkeypatch):
+    _stream_lesson(monkeypatch, LESSON)
+    
+    steps = [step async for step in ollama_service.stream_lesson_steps("plants")]
+    
+    assert [step.title for step in steps] == ["Seeds", "Roots"]
+    assert steps[1].sections["EXPLANATION"] == "Roots pull water"
+
+
+@pytest.mark.asyncio
+async def test_stream_lesson_steps_raises_when_stream_is_cut_off_mid_step(monkeypatch):
+    # _stream_generate returns None when the stream breaks after tokens were forwarded
+    _stream_lesson(monkeypatch, None)
+    
+    steps = []
+    with pytest.raises(LessonStreamInterrupted):
+        async for step in ollama_service.stream_lesson_steps("plants"):
+            steps.append(step)
+    
+    # The complete step was streamed; the cut-off one is never reported
+    assert [step.title for step in steps] == ["Seeds"]
@@ -0,0 +1,53 @@
+"""
+Helpers for pulling the JSON payload out of free-form LLM responses.
+"""
+import re
+
+# Fenced markdown code blocks with an optional json language tag
+_MARKDOWN_BLOCK_RE = re.compile(r'```(?:json)?\s*\n?(.*?)\n?```', re.DOTALL | re.IGNORECASE)
+
+# Tokens that matter for bracket matching: whole string literals (so brackets inside them are
+# skipped) and the bracket characters themselves. Everything else is skipped by the regex engine.
+_BRACKET_TOKEN_RES = {
+    '{': re.compile(r'"(?:[^"\\]|\\.)*"|[{}]', re.DOTALL),
+    '[': re.compile(r'"(?:[^"\\]|\\.)*"|[\[\]]', re.DOTALL),
+}
+
+
+def find_json_value(content: str, opener: str = '{') -> str:
+    """
+    Return the first complete top-level JSON object (or array, with opener='[') in content.
+
+    Brackets are matched by depth in a single scan, so trailing prose that contains a stray
+    closing bracket does not end up in the result. If the value is never closed (a truncated
+    response), the span up to the last closing bracket is returned as before. Returns an
+    empty string when content has no opening bracket.
+    """
+    start_idx = content.find(opener)
+    if start_idx == -1:
+        return ""
+
+    closer = '}' if opener == '{' else ']'
+    depth = 0
+    for match in _BRACKET_TOKEN_RES[opener].finditer(content, start_idx):
+        token = match.group()
+        if token == opener:
+            depth += 1
+        elif token == closer:
+            depth -= 1
+            if depth == 0:
+                return content[start_idx:match.end()]
+
+    end_idx = content.rfind(closer)
+    return content[start_idx:end_idx + 1] if end_idx > start_idx else ""
+
+
+def extract_json_from_markdown(content: str) -> str:
+    """Extract JSON content from a markdown code block, or the first JSON object in the text"""
+    # Both lookups scan the response in place; only the extracted span is copied
+    match = _MARKDOWN_BLOCK_RE.search(content)
+    if match:
+        return match.group(1).strip()
+
+    # Otherwise take the first balanced {...} object, or the original content if there is none
+    return find_json_value(content) or content.strip()